@@ -4,12 +4,61 @@
 Claude-Discord Bridgeの設定を管理する
 """
 
+import errno
 import os
+import re
 import json
+import shutil
+import stat
 from pathlib import Path
 from typing import Dict, Optional, List
 import configparser
 
+# .envの `KEY=VALUE` 行を一括抽出する（コメント行・空行はキー先頭の文字クラスで除外される）
+_ENV_LINE_RE = re.compile(rb'(?m)^[ \t]*([A-Za-z_]\w*)[ \t]*=[ \t]*(.*?)[ \t\r]*$')
+
+# .envが無い場合の共有の空辞書（読み取り専用として扱う）
+_EMPTY_ENV: Dict[str, str] = {}
+
+
+def _stat_mode(path: Path) -> Optional[int]:
+    """パスのst_modeを返す（存在しない場合はNone）"""
+    try:
+        return os.stat(path).st_mode
+    except FileNotFoundError:
+        return None
+
+
+def _fast_read_bytes(path: Path, size_hint: int = 8192) -> bytes:
+    """
+    小さなファイルをos.open/os.readで読み込む
+    
+    組み込みのopen()が行うfstat/lseekを省き、サイズが既知ならread 1回で読み終える。
+    
+    Args:
+        path: 読み込むファイルのパス
+        size_hint: 想定サイズ（呼び出し側でstat済みの場合はst_size）
+        
+    Returns:
+        ファイルの内容
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        # 想定より1バイト多く要求し、満たなければEOFに到達している
+        chunk_size = size_hint + 1
+        data = os.read(fd, chunk_size)
+        if len(data) < chunk_size:
+            return data
+        chunks = [data]
+        while True:
+            data = os.read(fd, chunk_size)
+            if not data:
+                return b''.join(chunks)
+            chunks.append(data)
+    finally:
+        os.close(fd)
+
+
 class SettingsManager:
     """設定の読み込み、保存、管理を行うクラス"""
     
@@ -21,48 +70,108 @@ class SettingsManager:
         self.attachments_dir = self.config_dir / 'attachments'
         self.run_dir = self.config_dir / 'run'
         
-        # 既存の設定を移行（初回のみ）
-        self._migrate_from_home_dir()
+        # .envのパース結果キャッシュ（mtimeで無効化）
+        self._env_cache: Optional[Dict[str, str]] = None
+        self._env_mtime: Optional[int] = None
+        
+        # 既存の設定の移行はファイル操作が必要になるまで遅延する
+        self._migrated = False
+        
+    def ensure_migrated(self):
+        """ホームディレクトリからの設定移行を未実施なら実行"""
+        if not self._migrated:
+            self._migrate_from_home_dir()
+            self._migrated = True
         
     def _migrate_from_home_dir(self):
         """ホームディレクトリからプロジェクトディレクトリへ設定を移行"""
+        # 移行済みならセンチネルの存在確認のみで終了
+        sentinel = self.config_dir / '.migrated'
+        if sentinel.exists():
+            return
+        
         old_dir = Path.home() / '.claude-discord-bridge'
         
-        # .envファイルの移行
-        if old_dir.exists() and not self.env_file.exists():
-            old_env = old_dir / '.env'
-            if old_env.exists():
-                import shutil
+        # .envファイルの移行（旧ファイルのstat1回で旧ディレクトリの有無も判定する）
+        old_env = old_dir / '.env'
+        old_env_mode = _stat_mode(old_env)
+        if old_env_mode is not None and stat.S_ISREG(old_env_mode) and _stat_mode(self.env_file) is None:
+            try:
+                # 同一ファイルシステムならリネームのみで済む
+                os.replace(old_env, self.env_file)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
                 shutil.copy2(old_env, self.env_file)
-                print(f"📦 Migrated .env: {old_env} → {self.env_file}")
+                old_env.unlink()
+            print(f"📦 Migrated .env: {old_env} → {self.env_file}")
         
         # attachmentsディレクトリの移行
-        if old_dir.exists():
-            old_attachments = old_dir / 'attachments'
-            if old_attachments.exists() and old_attachments.is_dir():
-                if not self.attachments_dir.exists():
-                    import shutil
+        old_attachments = old_dir / 'attachments'
+        old_attachments_mode = _stat_mode(old_attachments)
+        if old_attachments_mode is not None and stat.S_ISDIR(old_attachments_mode):
+            if _stat_mode(self.attachments_dir) is None:
+                try:
+                    os.rename(old_attachments, self.attachments_dir)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
                     shutil.move(str(old_attachments), str(self.attachments_dir))
-                    print(f"📦 Migrated attachments: {old_attachments} → {self.attachments_dir}")
+                print(f"📦 Migrated attachments: {old_attachments} → {self.attachments_dir}")
+        
+        try:
+            sentinel.touch()
+        except OSError:
+            # 書き込めない環境では次回も移行チェックを行うだけなので無視
+            pass
     
     def ensure_config_dir(self):
         """設定ディレクトリを作成"""
+        self.ensure_migrated()
         self.config_dir.mkdir(exist_ok=True)
         self.attachments_dir.mkdir(exist_ok=True)
         self.run_dir.mkdir(exist_ok=True)
         
     def load_env(self) -> Dict[str, str]:
-        """環境変数を読み込み"""
-        env_vars = {}
-        if self.env_file.exists():
-            with open(self.env_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        env_vars[key.strip()] = value.strip()
+        """環境変数を読み込み（.envのmtimeが変わらない限りキャッシュを返す）"""
+        return dict(self._cached_env())
+    
+    def _cached_env(self) -> Dict[str, str]:
+        """
+        .envのパース結果を取得（キャッシュをそのまま返すため、呼び出し側は変更しないこと）
+        
+        Returns:
+            環境変数の辞書（キャッシュ本体）
+        """
+        try:
+            st = os.stat(self.env_file)
+        except FileNotFoundError:
+            self._env_cache = None
+            self._env_mtime = None
+            if self._migrated:
+                return _EMPTY_ENV
+            # .envが無い場合のみ旧ディレクトリからの移行を試みる
+            self.ensure_migrated()
+            return self._cached_env()
+        
+        mtime = st.st_mtime_ns
+        if self._env_cache is not None and mtime == self._env_mtime:
+            return self._env_cache
+        
+        data = _fast_read_bytes(self.env_file, st.st_size)
+        env_vars = {
+            key.decode('utf-8'): value.decode('utf-8')
+            for key, value in _ENV_LINE_RE.findall(data)
+        }
+        
+        self._env_cache = env_vars
+        self._env_mtime = mtime
         return env_vars
     
+    def _get_env(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """環境変数を1つ取得（設定の取得ごとに辞書全体をコピーしない）"""
+        return self._cached_env().get(key, default)
+    
     def save_env(self, env_vars: Dict[str, str]):
         """環境変数を保存"""
         self.ensure_config_dir()
@@ -74,12 +183,15 @@ class SettingsManager:
         
         # Set permissions to 600 (owner read/write only)
         os.chmod(self.env_file, 0o600)
+        
+        # 書き込み直後はmtimeの粒度次第で変化を検出できないため明示的に破棄
+        self._env_cache = None
+        self._env_mtime = None
     
     
     def get_token(self) -> Optional[str]:
         """Discord bot tokenを取得"""
-        env_vars = self.load_env()
-        return env_vars.get('DISCORD_BOT_TOKEN')
+        return self._get_env('DISCORD_BOT_TOKEN')
     
     def set_token(self, token: str):
         """Discord bot tokenを設定"""
@@ -94,29 +206,33 @@ class SettingsManager:
     def get_port(self, service: str = 'flask') -> int:
         """サービスのポート番号を取得"""
         # 環境変数から読み取る
-        env_vars = self.load_env()
         port_map = {
-            'flask': int(env_vars.get('FLASK_PORT', '5001'))  # macOS ControlCenter対策
+            'flask': int(self._get_env('FLASK_PORT', '5001'))  # macOS ControlCenter対策
         }
         return port_map.get(service, 5001)
     
+    def get_git_concurrency(self) -> int:
+        """git/ghサブプロセスの同時実行数の上限を取得（WSL/macOSなどでは小さくする）"""
+        try:
+            return max(1, int(self._get_env('GIT_CONCURRENCY', '4')))
+        except ValueError:
+            return 4
+    
     def get_claude_work_dir(self) -> str:
         """Claude Codeの作業ディレクトリを取得"""
-        env_vars = self.load_env()
-        return env_vars.get('CLAUDE_WORK_DIR', os.getcwd())
+        return self._get_env('CLAUDE_WORK_DIR', os.getcwd())
     
     def get_claude_options(self) -> str:
         """Claude Codeの起動オプションを取得"""
-        env_vars = self.load_env()
-        return env_vars.get('CLAUDE_OPTIONS', '')
+        return self._get_env('CLAUDE_OPTIONS', '')
     
     
     def is_configured(self) -> bool:
         """初期設定が完了しているかチェック"""
         # 基本的な設定ファイルの存在とトークンの有無をチェック
-        return (self.env_file.exists() and 
-                self.get_token() is not None and 
-                self.get_token() != 'your_token_here')
+        # load_envは.envが無ければ空辞書を返すため、トークンの有無がファイルの存在確認を兼ねる
+        token = self.get_token()
+        return token is not None and token != 'your_token_here'
 
 if __name__ == "__main__":
     # Test settings manager
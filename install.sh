@@ -146,6 +146,7 @@ flask>=2.0.0
 requests>=2.20.0
 python-dotenv>=0.19.0
 psutil>=5.8.0
+pygit2>=1.9.0
 EOF
     
     # Install dependencies
@@ -7,14 +7,39 @@
 """
 
 import asyncio
+import fnmatch
+import glob
+import os
+import signal
 import subprocess
 import logging
+import threading
 from pathlib import Path
-from typing import List, Tuple, Optional, Union
+from typing import Any, Dict, List, Tuple, Optional, Union
 
 logger = logging.getLogger(__name__)
 
 
+def _kill_process(process: asyncio.subprocess.Process, kill_group: bool) -> None:
+    """
+    子プロセスを強制終了する
+    
+    Args:
+        process: 終了させるプロセス
+        kill_group: Trueの場合はプロセスグループごと終了させる（孫プロセスも含む）
+    """
+    if kill_group:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
 async def async_run(
     command: List[str],
     cwd: Optional[Union[str, Path]] = None,
@@ -44,21 +69,29 @@ async def async_run(
         if cwd is not None and isinstance(cwd, Path):
             cwd = str(cwd)
         
-        if verbose:
-            logger.debug(f"Executing command: {' '.join(command)} in {cwd or 'current directory'}")
+        if verbose and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Executing command: %s in %s", ' '.join(command), cwd or 'current directory')
         
         # サブプロセスの作成
+        # 出力はcommunicate()でEOFまでまとめて読む。stdinは閉じておき、認証などの入力待ちで
+        # 止まらずすぐに失敗させる（ボットの端末のstdinを子プロセスに引き継がない）
+        # タイムアウト指定時は新しいプロセスグループで起動し、打ち切る際に孫プロセス
+        # （git pushのgit-remote-httpsなど）もまとめて終了させる（パイプが閉じるまで待たされないように）
+        kill_group = timeout is not None and hasattr(os, 'killpg')
         if capture_output:
             process = await asyncio.create_subprocess_exec(
                 *command,
                 cwd=cwd,
+                stdin=asyncio.subprocess.DEVNULL,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=kill_group
             )
         else:
             process = await asyncio.create_subprocess_exec(
                 *command,
-                cwd=cwd
+                cwd=cwd,
+                start_new_session=kill_group
             )
         
         try:
@@ -75,8 +108,14 @@ async def async_run(
                 )
                 stdout, stderr = b"", b""
                 
+        except asyncio.CancelledError:
+            # 呼び出し側がキャンセルされた場合も子プロセス（と孫プロセス）を残さない
+            if process.returncode is None:
+                _kill_process(process, kill_group)
+                await process.wait()
+            raise
         except asyncio.TimeoutError:
-            process.kill()
+            _kill_process(process, kill_group)
             await process.wait()
             return False, f"Command timed out after {timeout} seconds"
         
@@ -92,14 +131,12 @@ async def async_run(
         else:
             # エラー時
             if capture_output:
-                error_output = stderr.decode('utf-8', errors='replace').strip()
-                # stderrが空の場合はstdoutも確認
-                if not error_output:
-                    error_output = stdout.decode('utf-8', errors='replace').strip()
+                # stderrが空の場合はstdoutを使う（空でない方のみデコードする）
+                error_bytes = stderr.strip() or stdout.strip()
+                if error_bytes:
+                    return False, error_bytes.decode('utf-8', errors='replace')
                 # それでも空の場合はエラーコードを返す
-                if not error_output:
-                    error_output = f"Command failed with exit code {process.returncode}"
-                return False, error_output
+                return False, f"Command failed with exit code {process.returncode}"
             else:
                 return False, f"Command failed with exit code {process.returncode}"
                 
@@ -144,8 +181,8 @@ def sync_run(
         if cwd is not None and isinstance(cwd, Path):
             cwd = str(cwd)
         
-        if verbose:
-            logger.debug(f"Executing command: {' '.join(command)} in {cwd or 'current directory'}")
+        if verbose and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Executing command: %s in %s", ' '.join(command), cwd or 'current directory')
         
         # コマンドの実行
         if shell:
@@ -158,30 +195,28 @@ def sync_run(
             cmd,
             cwd=cwd,
             capture_output=capture_output,
-            text=True,
             timeout=timeout,
             shell=shell
         )
         
-        # 結果の処理
+        # 結果の処理（出力はbytesのまま受け取り、返す必要があるものだけをデコードする）
         if result.returncode == 0:
             # 成功時
             if capture_output:
                 output = result.stdout.strip()
-                return True, output if output else "Command completed successfully"
+                if output:
+                    return True, output.decode('utf-8', errors='replace')
+                return True, "Command completed successfully"
             else:
                 return True, "Command completed successfully"
         else:
             # エラー時
             if capture_output:
-                error_output = result.stderr.strip()
-                # stderrが空の場合はstdoutも確認
-                if not error_output:
-                    error_output = result.stdout.strip()
-                # それでも空の場合はエラーコードを返す
-                if not error_output:
-                    error_output = f"Command failed with exit code {result.returncode}"
-                return False, error_output
+                # stderrが空の場合はstdoutを使い、それでも空ならエラーコードを返す
+                error_bytes = result.stderr.strip() or result.stdout.strip()
+                if error_bytes:
+                    return False, error_bytes.decode('utf-8', errors='replace')
+                return False, f"Command failed with exit code {result.returncode}"
             else:
                 return False, f"Command failed with exit code {result.returncode}"
                 
@@ -197,10 +232,250 @@ def sync_run(
         return False, error_msg
 
 
+class GitWorker:
+    """
+    pygit2（libgit2）を使ったインプロセスのGit操作
+    
+    pygit2がインストールされている場合、add/commit/status/diff --cached/remote（get-url・set-url・add）を
+    gitプロセスのfork/execなしで実行する。対応できない引数・リポジトリ状態（フックや署名の設定など）
+    の場合はNoneを返し、呼び出し側はgitコマンドの実行にフォールバックする。
+    """
+    
+    _GLOB_CHARS = ('*', '?', '[')
+    
+    def __init__(self):
+        """初期化（pygit2は初回利用時に読み込む）"""
+        self._pygit2 = None
+        self._available: Optional[bool] = None
+        self._repos: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def _load(self) -> bool:
+        """pygit2を遅延インポートし、利用可能かを返す"""
+        if self._available is None:
+            try:
+                import pygit2
+                self._pygit2 = pygit2
+                self._available = True
+            except ImportError:
+                self._available = False
+        return self._available
+    
+    def _open(self, path: str):
+        """パスがリポジトリのルートであればRepositoryを返す（それ以外はNone）"""
+        repo = self._repos.get(path)
+        if repo is None:
+            if not os.path.isdir(os.path.join(path, '.git')):
+                return None
+            repo = self._pygit2.Repository(path)
+            self._repos[path] = repo
+        # 外部のgitコマンドによる変更を反映する
+        repo.index.read()
+        return repo
+    
+    def run(self, path: Union[str, Path], git_args: List[str]) -> Optional[Tuple[bool, str]]:
+        """
+        Gitコマンドをインプロセスで実行
+        
+        Args:
+            path: リポジトリのルートパス
+            git_args: gitコマンドの引数（例: ["add", "."]）
+            
+        Returns:
+            (成功フラグ, 出力メッセージ)、インプロセスで実行できない場合はNone
+        """
+        if not git_args or not self._load():
+            return None
+        
+        handler = {
+            'add': self.add,
+            'commit': self.commit,
+            'status': self.status,
+            'diff': self.diff,
+            'remote': self.remote,
+        }.get(git_args[0])
+        if handler is None:
+            return None
+        
+        path = os.path.abspath(str(path))
+        try:
+            with self._lock:
+                repo = self._open(path)
+                if repo is None:
+                    return None
+                return handler(repo, git_args[1:])
+        except Exception as e:
+            logger.debug("In-process git %s failed, falling back to git command: %s", git_args[0], e)
+            return None
+    
+    async def run_async(self, path: Union[str, Path], git_args: List[str]) -> Optional[Tuple[bool, str]]:
+        """runをイベントループをブロックしないようスレッドプールで実行"""
+        if not git_args or not self._load():
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run, path, list(git_args))
+    
+    def add(self, repo, args: List[str]) -> Optional[Tuple[bool, str]]:
+        """git add <pathspec>... / git add -A"""
+        workdir = repo.workdir
+        if args in (['-A'], ['--all'], ['.']):
+            pathspecs = None
+        else:
+            if not args or any(arg.startswith('-') for arg in args):
+                return None
+            # 一致するファイルが無い場合のエラーはgitコマンドに任せる
+            for spec in args:
+                full = os.path.join(workdir, spec)
+                if any(c in spec for c in self._GLOB_CHARS):
+                    if not glob.glob(full):
+                        return None
+                elif not os.path.exists(full):
+                    return None
+            pathspecs = args
+        
+        index = repo.index
+        if pathspecs is None:
+            index.add_all()
+        else:
+            index.add_all(pathspecs)
+        
+        # 削除されたファイルもgit addと同様にステージする
+        for file_path, flags in repo.status().items():
+            if flags & self._pygit2.GIT_STATUS_WT_DELETED and self._matches(file_path, pathspecs):
+                index.remove(file_path)
+        index.write()
+        return True, "Command completed successfully"
+    
+    def _matches(self, file_path: str, pathspecs: Optional[List[str]]) -> bool:
+        """リポジトリ相対パスがpathspecのいずれかに一致するか"""
+        if pathspecs is None:
+            return True
+        for spec in pathspecs:
+            if any(c in spec for c in self._GLOB_CHARS):
+                if fnmatch.fnmatchcase(file_path, spec):
+                    return True
+            elif file_path == spec or file_path.startswith(spec.rstrip('/') + '/'):
+                return True
+        return False
+    
+    def commit(self, repo, args: List[str]) -> Optional[Tuple[bool, str]]:
+        """git commit -m <message>"""
+        if len(args) != 2 or args[0] != '-m':
+            return None
+        # フックやコミット署名はgitコマンドでしか再現できない
+        hooks_dir = os.path.join(repo.path, 'hooks')
+        for hook in ('pre-commit', 'prepare-commit-msg', 'commit-msg', 'post-commit'):
+            if os.access(os.path.join(hooks_dir, hook), os.X_OK):
+                return None
+        config = repo.config
+        if 'commit.gpgsign' in config and config.get_bool('commit.gpgsign'):
+            return None
+        
+        message = args[1]
+        if not message.strip():
+            return None
+        tree = repo.index.write_tree()
+        if repo.head_is_unborn:
+            if not len(repo.index):
+                return False, "nothing to commit"
+            parents = []
+        else:
+            head = repo.head.peel(self._pygit2.Commit)
+            if head.tree_id == tree:
+                return False, "nothing to commit, working tree clean"
+            parents = [head.id]
+        
+        signature = repo.default_signature
+        oid = repo.create_commit(
+            'HEAD', signature, signature,
+            message if message.endswith('\n') else message + '\n',
+            tree, parents
+        )
+        return True, f"[{repo.head.shorthand} {str(oid)[:7]}] {message.splitlines()[0]}"
+    
+    def diff(self, repo, args: List[str]) -> Optional[Tuple[bool, str]]:
+        """git diff --cached --quiet（ステージされた変更が無ければ成功）"""
+        if sorted(args) != ['--cached', '--quiet']:
+            return None
+        if repo.head_is_unborn:
+            staged = len(repo.index) > 0
+        else:
+            head = repo.head.peel(self._pygit2.Commit)
+            staged = len(repo.index.diff_to_tree(head.tree)) > 0
+        if staged:
+            return False, "Command failed with exit code 1"
+        return True, "Command completed successfully"
+    
+    def remote(self, repo, args: List[str]) -> Optional[Tuple[bool, str]]:
+        """git remote get-url <name> / set-url <name> <url> / add <name> <url>（URLの書き換え設定はlibgit2が適用する）"""
+        if not args or any(arg.startswith('-') for arg in args[1:]):
+            return None
+        subcommand, operands = args[0], args[1:]
+        if subcommand == 'get-url' and len(operands) == 1:
+            try:
+                return True, repo.remotes[operands[0]].url
+            except KeyError:
+                return False, f"error: No such remote '{operands[0]}'"
+        if subcommand not in ('set-url', 'add') or len(operands) != 2:
+            return None
+        
+        name, url = operands
+        exists = name in [remote.name for remote in repo.remotes]
+        if subcommand == 'set-url':
+            if not exists:
+                return False, f"error: No such remote '{name}'"
+            repo.remotes.set_url(name, url)
+        else:
+            if exists:
+                return False, f"error: remote {name} already exists."
+            repo.remotes.create(name, url)
+        return True, "Command completed successfully"
+    
+    def status(self, repo, args: List[str]) -> Optional[Tuple[bool, str]]:
+        """git status --porcelain / git status -s"""
+        if args not in (['--porcelain'], ['-s'], ['--short']):
+            return None
+        pygit2 = self._pygit2
+        index_codes = (
+            (pygit2.GIT_STATUS_INDEX_NEW, 'A'),
+            (pygit2.GIT_STATUS_INDEX_MODIFIED, 'M'),
+            (pygit2.GIT_STATUS_INDEX_DELETED, 'D'),
+            (pygit2.GIT_STATUS_INDEX_RENAMED, 'R'),
+            (pygit2.GIT_STATUS_INDEX_TYPECHANGE, 'T'),
+        )
+        worktree_codes = (
+            (pygit2.GIT_STATUS_WT_MODIFIED, 'M'),
+            (pygit2.GIT_STATUS_WT_DELETED, 'D'),
+            (pygit2.GIT_STATUS_WT_RENAMED, 'R'),
+            (pygit2.GIT_STATUS_WT_TYPECHANGE, 'T'),
+        )
+        lines = []
+        for file_path, flags in sorted(repo.status().items()):
+            if flags & pygit2.GIT_STATUS_IGNORED:
+                continue
+            if flags & pygit2.GIT_STATUS_WT_NEW:
+                lines.append(f"?? {file_path}")
+                continue
+            x = next((code for flag, code in index_codes if flags & flag), ' ')
+            y = next((code for flag, code in worktree_codes if flags & flag), ' ')
+            lines.append(f"{x}{y} {file_path}")
+        
+        output = "\n".join(lines)
+        return True, output if output else "Command completed successfully"
+
+
+# インプロセスGit操作の共有インスタンス
+_git_worker = GitWorker()
+
+# gitコマンドに常に付与する設定（コミット直後などに自動gcが走って処理が止まらないようにする）
+_GIT_CONFIG_OPTIONS = ("-c", "gc.auto=0")
+
+
 async def execute_git_command(
     path: Union[str, Path],
     git_args: List[str],
-    verbose: bool = True
+    verbose: bool = True,
+    timeout: Optional[float] = None
 ) -> Tuple[bool, str]:
     """
     Git専用のコマンド実行ヘルパー
@@ -209,6 +484,7 @@ async def execute_git_command(
         path: Gitリポジトリのパス
         git_args: gitコマンドの引数（例: ["add", "."]）
         verbose: 詳細ログを出力するか
+        timeout: gitコマンドのタイムアウト秒数（None で無制限、push等のネットワーク操作用）
         
     Returns:
         (成功フラグ, 出力メッセージ)
@@ -217,19 +493,25 @@ async def execute_git_command(
         >>> success, output = await execute_git_command("/repo", ["status"])
         >>> success, output = await execute_git_command("/repo", ["commit", "-m", "message"])
     """
-    # "git"を先頭に追加
-    command = ["git"] + git_args
+    # リポジトリは-Cで指定する（ログのコマンドをそのまま再実行でき、存在しないパスもgitのエラーとして返る）
+    command = ["git", "-C", str(path), *_GIT_CONFIG_OPTIONS, *git_args]
     
-    if verbose:
-        logger.info(f"Executing git command: {' '.join(command)} in {path}")
+    # コマンド文字列の結合はログが出力される場合のみ行う
+    if verbose and logger.isEnabledFor(logging.INFO):
+        logger.info("Executing git command: %s", ' '.join(command))
     
-    success, output = await async_run(command, cwd=path, verbose=False)
+    # add/commit/status/diff/remote get-urlはpygit2が使えればfork/execせずに実行する
+    result = await _git_worker.run_async(path, git_args)
+    if result is None:
+        result = await async_run(command, timeout=timeout, verbose=False)
+    success, output = result
     
     if verbose:
         if success:
-            logger.info(f"Git command succeeded: {' '.join(git_args)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Git command succeeded: %s", ' '.join(git_args))
         else:
-            logger.error(f"Git command failed: {' '.join(git_args)} - {output}")
+            logger.error("Git command failed: %s - %s", ' '.join(git_args), output)
     
     return success, output
 
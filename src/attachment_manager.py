@@ -423,6 +423,8 @@ class AttachmentManager:
         添付ファイルマネージャーの初期化
         """
         self.settings = SettingsManager()
+        # 旧ディレクトリのattachmentsを移行してから保存先を作成する
+        self.settings.ensure_migrated()
         self.storage_manager = StorageManager(self.settings.config_dir)
         self.downloader = AttachmentDownloader(self.storage_manager)
     
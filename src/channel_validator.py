@@ -9,9 +9,11 @@ Channel Validator - Discordチャンネルと権限の検証
 """
 
 import logging
-from typing import List, Optional, Dict, Set
+from typing import List, Optional, Dict, Set, Tuple
 import discord
 
+from src.claude_context_manager import STAGE_TO_CHANNEL
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,10 +34,45 @@ class ChannelValidator:
         "embed_links"    # リッチメッセージ用
     }
     
+    # 必要な権限をまとめたPermissions（is_supersetは内部で単一のint演算になる）
+    _REQUIRED = discord.Permissions(**dict.fromkeys(REQUIRED_PERMISSIONS, True))
+    
     def __init__(self):
         """初期化"""
+        # ギルドIDごとのチャンネル名→チャンネルのキャッシュ（チャンネル変更イベントで破棄）
+        self._channel_cache: Dict[int, Dict[str, Optional[discord.TextChannel]]] = {}
         logger.info("ChannelValidator initialized")
     
+    def invalidate(self, guild_id: int):
+        """
+        ギルドのチャンネルキャッシュを破棄
+        
+        Args:
+            guild_id: DiscordギルドID
+        """
+        self._channel_cache.pop(guild_id, None)
+    
+    def _scan_required_channels(self, guild: discord.Guild) -> Dict[str, discord.TextChannel]:
+        """
+        ギルド内のテキストチャンネルを1回走査し、必須チャンネル名と対応付ける
+        
+        Args:
+            guild: Discordギルド
+            
+        Returns:
+            必須チャンネル名→最初に一致したチャンネルの辞書
+        """
+        found_channels: Dict[str, discord.TextChannel] = {}
+        for channel in guild.text_channels:
+            # チャンネル名に必要なキーワードが含まれているかチェック
+            for required_channel in self.REQUIRED_CHANNELS:
+                if required_channel in channel.name:
+                    if required_channel not in found_channels:
+                        found_channels[required_channel] = channel
+                        logger.info(f"Found required channel: {channel.name} (#{channel.id})")
+                    break
+        return found_channels
+    
     async def validate_all_channels(self, guild: discord.Guild) -> List[str]:
         """
         全必須チャンネルの検証
@@ -46,43 +83,50 @@ class ChannelValidator:
         Returns:
             エラーメッセージのリスト（問題がない場合は空リスト）
         """
+        errors, _ = await self._validate_channels(guild)
+        return errors
+    
+    async def _validate_channels(self, guild: discord.Guild) -> Tuple[List[str], Dict[str, discord.TextChannel]]:
+        """
+        全必須チャンネルを検証し、検証中に解決したチャンネルも返す
+        
+        Args:
+            guild: Discordギルド
+        
+        Returns:
+            (エラーメッセージのリスト, 必須チャンネル名→チャンネルの辞書)
+        """
         errors = []
-        found_channels = set()
         
-        # ギルド内の全テキストチャンネルをチェック
-        for channel in guild.text_channels:
-            # チャンネル名に必要なキーワードが含まれているかチェック
-            for required_channel in self.REQUIRED_CHANNELS:
-                if required_channel in channel.name:
-                    found_channels.add(required_channel)
-                    logger.info(f"Found required channel: {channel.name} (#{channel.id})")
-                    break
+        # ギルド内の全テキストチャンネルを1回だけ走査し、結果をキャッシュにも反映
+        found_channels = self._scan_required_channels(guild)
+        self._channel_cache[guild.id] = dict(found_channels)
         
         # 見つからなかったチャンネルを特定
-        missing_channels = set(self.REQUIRED_CHANNELS) - found_channels
-        for missing in missing_channels:
+        for missing in self.REQUIRED_CHANNELS:
+            if missing in found_channels:
+                continue
             error_msg = f"Required channel not found: #{missing}"
             errors.append(error_msg)
             logger.error(error_msg)
         
-        # 各チャンネルの権限もチェック
-        for channel in guild.text_channels:
-            for required_channel in self.REQUIRED_CHANNELS:
-                if required_channel in channel.name:
-                    permission_errors = await self.validate_channel_permissions(channel)
-                    if permission_errors:
-                        for perm_error in permission_errors:
-                            errors.append(f"#{channel.name}: {perm_error}")
-                    break
+        # 見つかったチャンネルのみ権限をチェック（ボットのメンバーは1回だけ解決する）
+        bot_member = guild.me
+        for channel in found_channels.values():
+            permission_errors = await self.validate_channel_permissions(channel, bot_member)
+            for perm_error in permission_errors:
+                errors.append(f"#{channel.name}: {perm_error}")
         
-        return errors
+        return errors, found_channels
     
-    async def validate_channel_permissions(self, channel: discord.TextChannel) -> List[str]:
+    async def validate_channel_permissions(self, channel: discord.TextChannel,
+                                           bot_member: Optional[discord.Member] = None) -> List[str]:
         """
         チャンネル権限の検証
         
         Args:
             channel: Discordテキストチャンネル
+            bot_member: ボットのメンバー（省略時はchannel.guild.meから取得）
             
         Returns:
             不足している権限のリスト（問題がない場合は空リスト）
@@ -90,7 +134,8 @@ class ChannelValidator:
         errors = []
         
         # ボットのメンバーオブジェクトを取得
-        bot_member = channel.guild.me
+        if bot_member is None:
+            bot_member = channel.guild.me
         if not bot_member:
             errors.append("Bot member not found in guild")
             return errors
@@ -98,7 +143,11 @@ class ChannelValidator:
         # チャンネルでのボットの権限を取得
         permissions = channel.permissions_for(bot_member)
         
-        # 必要な権限をチェック
+        # 全権限が揃っていればビット演算のみで判定を終える
+        if isinstance(permissions, discord.Permissions) and permissions.is_superset(self._REQUIRED):
+            return errors
+        
+        # 不足している権限を特定
         missing_permissions = []
         for perm_name in self.REQUIRED_PERMISSIONS:
             if not getattr(permissions, perm_name, False):
@@ -121,12 +170,23 @@ class ChannelValidator:
         Returns:
             見つかったチャンネル、見つからない場合はNone
         """
+        guild_cache = self._channel_cache.get(guild.id)
+        if guild_cache is None:
+            guild_cache = self._scan_required_channels(guild)
+            self._channel_cache[guild.id] = guild_cache
+        
+        if name in guild_cache:
+            return guild_cache[name]
+        
+        # 必須チャンネル以外の検索語は個別に走査して結果（未検出も含む）を記録
         for channel in guild.text_channels:
             if name in channel.name:
                 logger.info(f"Found channel: {channel.name} for search term: {name}")
+                guild_cache[name] = channel
                 return channel
         
         logger.warning(f"Channel not found for search term: {name}")
+        guild_cache[name] = None
         return None
     
     def get_required_channel(self, guild: discord.Guild, stage: str) -> Optional[discord.TextChannel]:
@@ -140,15 +200,7 @@ class ChannelValidator:
         Returns:
             対応するチャンネル、見つからない場合はNone
         """
-        channel_map = {
-            "idea": "1-idea",
-            "requirements": "2-requirements",
-            "design": "3-design",
-            "tasks": "4-tasks",
-            "development": "5-development"
-        }
-        
-        channel_name = channel_map.get(stage)
+        channel_name = STAGE_TO_CHANNEL.get(stage)
         if not channel_name:
             logger.error(f"Unknown stage: {stage}")
             return None
@@ -191,15 +243,16 @@ class ChannelValidator:
             "permission_status": {}
         }
         
-        # チャンネル検証
-        channel_errors = await self.validate_all_channels(guild)
+        # チャンネル検証（解決済みのチャンネルは詳細ステータスにも再利用）
+        channel_errors, found_channels = await self._validate_channels(guild)
         if channel_errors:
             result["is_valid"] = False
             result["errors"].extend(channel_errors)
         
         # 各チャンネルの詳細ステータス
+        bot_member = guild.me
         for required_channel in self.REQUIRED_CHANNELS:
-            channel = self.get_channel_by_name(guild, required_channel)
+            channel = found_channels.get(required_channel)
             if channel:
                 result["channel_status"][required_channel] = {
                     "found": True,
@@ -208,7 +261,7 @@ class ChannelValidator:
                 }
                 
                 # 権限チェック
-                perms = channel.permissions_for(guild.me)
+                perms = channel.permissions_for(bot_member)
                 result["permission_status"][required_channel] = {
                     perm: getattr(perms, perm, False)
                     for perm in self.REQUIRED_PERMISSIONS
@@ -221,7 +274,7 @@ class ChannelValidator:
                 }
         
         # ボットのロール確認
-        bot_roles = [role.name for role in guild.me.roles if role.name != "@everyone"]
+        bot_roles = [role.name for role in bot_member.roles if role.name != "@everyone"]
         if not bot_roles:
             result["warnings"].append("Bot has no custom roles assigned")
         
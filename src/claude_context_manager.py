@@ -8,18 +8,184 @@ Claude Context Manager - Claude Codeへのコンテキストとプロンプト
 3. Discord統合情報の整形
 """
 
+import functools
 import logging
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Iterable, NamedTuple, Set, Tuple
 from datetime import datetime
 from string import Template
 
 logger = logging.getLogger(__name__)
 
+# ステージ名→Discordチャンネル名（チャンネル名はこの文字列を含む。channel_validatorなどからも参照する）
+STAGE_TO_CHANNEL = {
+    "idea": "1-idea",
+    "requirements": "2-requirements",
+    "design": "3-design",
+    "tasks": "4-tasks",
+    "development": "5-development"
+}
+_CHANNEL_TO_STAGE = {channel: stage for stage, channel in STAGE_TO_CHANNEL.items()}
+_NUMBER_TO_STAGE = {channel.split('-', 1)[0]: stage for stage, channel in STAGE_TO_CHANNEL.items()}
+
+# !complete時に次チャンネルへ投稿するメッセージの接頭辞（後ろにアイデア名を連結する）
+_NEXT_STAGE_LABELS = {
+    "idea": "要件定義: ",
+    "requirements": "設計: ",
+    "design": "タスクリスト作成: ",
+    "tasks": "開発: "
+}
+_DEFAULT_NEXT_STAGE_LABEL = "次フェーズ: "
+
+# テンプレートファイルが無い場合のデフォルトプロンプト（{idea_name}/{sdd_path}/{parent_content}を置換して使う）
+_IDEA_DEFAULT_PROMPT = """親メッセージの内容をもとに、./projects/{idea_name}/idea.mdに企画提案書を記載してください。
+
+親メッセージ:
+{parent_content}
+
+以下の要素を含めて、マークダウン形式で記載してください：
+- プロジェクトの概要
+- 解決したい課題
+- 提案する解決策
+- 期待される効果
+- 実装の概要（技術的な観点）"""
+
+_REQUIREMENTS_DEFAULT_PROMPT = """./projects/{idea_name}/idea.mdを読んで、{sdd_path}のRequirement Gatheringセクションに従って./projects/{idea_name}/requirements.mdに要件定義を記載してください.
+
+具体的には以下の形式で記載してください：
+
+1. Introduction セクション
+   - 機能の概要を明確に記述
+
+2. Requirements セクション
+   - 各要件を階層的な番号付きリストで記載
+   - 各要件には以下を含める：
+     - User Story: "As a [role], I want [feature], so that [benefit]" 形式
+     - Acceptance Criteria: EARS形式（Easy Approach to Requirements Syntax）で記載
+       - WHEN [event] THEN [system] SHALL [response]
+       - IF [precondition] THEN [system] SHALL [response]
+
+エッジケース、ユーザー体験、技術的制約、成功基準を考慮して、包括的な要件を定義してください。"""
+
+_DESIGN_DEFAULT_PROMPT = """./projects/{idea_name}/requirements.mdを読んで、{sdd_path}のDesignセクションに従って./projects/{idea_name}/design.mdに設計書を記載してください。
+
+具体的には以下のセクションを含めてください：
+- Overview: 設計の概要
+- Architecture: システムアーキテクチャ
+- Components and Interfaces: コンポーネントとインターフェース
+- Data Models: データモデル
+- Error Handling: エラーハンドリング
+- Testing Strategy: テスト戦略
+
+必要に応じてMermaidダイアグラムを使用してください。"""
+
+_TASKS_DEFAULT_PROMPT = """./projects/{idea_name}/design.mdを読んで、{sdd_path}のTask Listセクションに従って./projects/{idea_name}/tasks.mdに実装タスクリストを記載してください。
+
+具体的には以下の形式で記載してください：
+- タスクをチェックボックスリスト形式で作成
+- 各タスクは具体的で実行可能なコーディングタスク
+- タスクは段階的に実装できるよう順序立てる
+- 各タスクに要件への参照を含める"""
+
+_DEVELOPMENT_DEFAULT_PROMPT = """./projects/{idea_name}/tasks.mdのタスクリストに従って開発を進めてください。
+
+作業ディレクトリ: ./development/{idea_name}/
+
+タスクを順番に実装し、テスト駆動開発のアプローチを採用してください。"""
+
+
+class _StageConfig(NamedTuple):
+    """ステージ別のプロンプト設定"""
+    template_path: str
+    requires_parent_content: bool
+    default_prompt: str
+
+
+# ステージ別の設定
+_STAGE_CONFIGS: Dict[str, _StageConfig] = {
+    'idea': _StageConfig('idea.md', True, _IDEA_DEFAULT_PROMPT),
+    'requirements': _StageConfig('complete/requirements.md', False, _REQUIREMENTS_DEFAULT_PROMPT),
+    'design': _StageConfig('complete/design.md', False, _DESIGN_DEFAULT_PROMPT),
+    'tasks': _StageConfig('complete/tasks.md', False, _TASKS_DEFAULT_PROMPT),
+    'development': _StageConfig('complete/development.md', False, _DEVELOPMENT_DEFAULT_PROMPT)
+}
+
+# ClaudeContextManager初期化時に読み込んでおくテンプレート
+_PRELOAD_TEMPLATES = ("context_base.md",) + tuple(config.template_path for config in _STAGE_CONFIGS.values())
+
+# 初期コンテキストの固定部分
+_CONTEXT_HEADER = "=== Discord スレッド情報 ===\n"
+_CONTEXT_NOTICE = "\n【重要】このセッションはDiscordのスレッド専用です。\n"
+_PARENT_HEADER = "\n=== 親メッセージ ===\n"
+_PARENT_FOOTER = "==================="
+
+# 未定義の変数を示す番兵
+_MISSING = object()
+
+# thread_info未指定時の共有の空辞書（読み取り専用として扱う）
+_EMPTY_DICT: Dict[str, str] = {}
+
+# テンプレートファイルの内容キャッシュ（パス→(mtime_ns, 内容)）
+_TEMPLATE_CACHE: Dict[Path, Tuple[int, str]] = {}
+_TEMPLATE_CACHE_SIZE = 64
+
+
+@functools.lru_cache(maxsize=64)
+def _resolve_stage(channel_name: str) -> Optional[str]:
+    """
+    チャンネル名からステージを判定（チャンネル名の種類は少ないため結果をキャッシュする）
+    
+    Args:
+        channel_name: Discordチャンネル名
+        
+    Returns:
+        ステージ名、該当しない場合はNone
+    """
+    # 通常のチャンネル名は「番号-ステージ名」で始まるため、番号で直接引いて接頭辞を確認する
+    stage = _NUMBER_TO_STAGE.get(channel_name.partition('-')[0])
+    if stage is not None and channel_name.startswith(STAGE_TO_CHANNEL[stage]):
+        return stage
+    
+    # 接頭辞付きのチャンネル名は部分一致で判定
+    for key, stage in _CHANNEL_TO_STAGE.items():
+        if key in channel_name:
+            return stage
+    
+    return None
+
+
+class _RenderVariables:
+    """
+    format_map用の変数マッピング（元の変数辞書をコピーせずに参照する）
+    
+    ${name}は{name}、$nameは{$name}に変換されている前提で、
+    Noneの値は空文字列として扱い、未定義の変数は元のプレースホルダー表記のまま残す（safe_substitute互換）。
+    """
+    
+    __slots__ = ('_variables',)
+    
+    def __init__(self, variables: Dict[str, Any]):
+        self._variables = variables
+    
+    def __getitem__(self, key: str) -> Any:
+        if key.startswith('$'):
+            name = key[1:]
+            placeholder = key
+        else:
+            name = key
+            placeholder = '${' + key + '}'
+        
+        value = self._variables.get(name, _MISSING)
+        if value is _MISSING:
+            return placeholder
+        return '' if value is None else value
+
 
 class PromptTemplateLoader:
     """プロンプトテンプレートをファイルから読み込むクラス"""
     
+    __slots__ = ('prompts_dir', '_combined_cache', '_format_cache', '_known_missing')
+    
     def __init__(self, prompts_dir: Optional[Path] = None):
         """
         初期化
@@ -31,6 +197,15 @@ class PromptTemplateLoader:
             self.prompts_dir = Path(__file__).parent.parent / "prompts"
         else:
             self.prompts_dir = prompts_dir
+        
+        # 結合済みテンプレートのキャッシュ（(base, command)→(baseのmtime, commandのmtime, 結合結果)）
+        self._combined_cache: Dict[Tuple[str, str], Tuple[Optional[int], Optional[int], Optional[str]]] = {}
+        
+        # テンプレート内容→format_map用文字列への変換結果のキャッシュ
+        self._format_cache: Dict[str, str] = {}
+        
+        # 存在しなかったテンプレート名（以降はstatせずに存在しないものとして扱う）
+        self._known_missing: Set[str] = set()
             
         logger.info(f"PromptTemplateLoader initialized with prompts directory: {self.prompts_dir}")
     
@@ -46,18 +221,53 @@ class PromptTemplateLoader:
         """
         template_path = self.prompts_dir / template_name
         
-        if not template_path.exists():
-            logger.warning(f"Template file not found: {template_path}")
+        try:
+            mtime = template_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            logger.warning("Template file not found: %s", template_path)
             return None
+        except OSError as e:
+            logger.error("Error loading template %s: %s", template_path, e)
+            return None
+        
+        # 更新されていなければキャッシュした内容を返す
+        cached = _TEMPLATE_CACHE.get(template_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
             
         try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                logger.info(f"Loaded template: {template_path}")
-                return content
-        except Exception as e:
-            logger.error(f"Error loading template {template_path}: {e}")
+            content = template_path.read_text(encoding='utf-8')
+            logger.debug("Loaded template: %s", template_path)
+        except FileNotFoundError:
+            # stat後に削除された場合
+            logger.warning("Template file not found: %s", template_path)
             return None
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error("Error loading template %s: %s", template_path, e)
+            return None
+        
+        if len(_TEMPLATE_CACHE) >= _TEMPLATE_CACHE_SIZE:
+            # 最も古く登録されたエントリを破棄
+            _TEMPLATE_CACHE.pop(next(iter(_TEMPLATE_CACHE)))
+        _TEMPLATE_CACHE[template_path] = (mtime, content)
+        return content
+    
+    def preload_templates(self, template_names: Iterable[str]):
+        """
+        テンプレートをまとめて読み込んでキャッシュしておく
+        
+        Args:
+            template_names: 読み込むテンプレート名（存在しないものは読み飛ばす）
+        """
+        for template_name in template_names:
+            # 存在しないテンプレートは_known_missingに記録されるだけで警告は出さない
+            if self._get_mtime(template_name) is not None:
+                self.load_template(template_name)
+    
+    @staticmethod
+    def clear_cache():
+        """テンプレートキャッシュを破棄（主にテスト用）"""
+        _TEMPLATE_CACHE.clear()
     
     def load_and_combine_templates(self, command_template: str, 
                                    base_template: str = "context_base.md") -> Optional[str]:
@@ -71,23 +281,54 @@ class PromptTemplateLoader:
         Returns:
             結合されたテンプレート内容、失敗時はNone
         """
+        # 両ファイルとも更新されていなければ前回の結合結果を返す
+        key = (base_template, command_template)
+        base_mtime = self._get_mtime(base_template)
+        command_mtime = self._get_mtime(command_template)
+        cached = self._combined_cache.get(key)
+        if cached is not None and cached[0] == base_mtime and cached[1] == command_mtime:
+            return cached[2]
+        
+        combined = self._combine_templates(command_template, base_template)
+        self._combined_cache[key] = (base_mtime, command_mtime, combined)
+        return combined
+    
+    def _get_mtime(self, template_name: str) -> Optional[int]:
+        """
+        テンプレートファイルのmtime（ナノ秒）を返す、存在しない場合はNone
+        
+        一度存在しなかったテンプレートは記録しておき、以降はstatしない
+        （プロンプトファイルを後から追加した場合は再起動が必要）。
+        """
+        if template_name in self._known_missing:
+            return None
+        try:
+            return (self.prompts_dir / template_name).stat().st_mtime_ns
+        except FileNotFoundError:
+            self._known_missing.add(template_name)
+            return None
+        except OSError:
+            return None
+    
+    def _combine_templates(self, command_template: str, base_template: str) -> Optional[str]:
+        """ベーステンプレートとコマンドテンプレートを読み込んで結合"""
         # ベーステンプレートを読み込み
         base_content = self.load_template(base_template)
         if not base_content:
-            logger.warning(f"Base template not found: {base_template}. Using command template only.")
+            logger.warning("Base template not found: %s. Using command template only.", base_template)
             base_content = ""
         
         # コマンドテンプレートを読み込み
         command_content = self.load_template(command_template)
         if not command_content:
-            logger.warning(f"Command template not found: {command_template}")
+            logger.warning("Command template not found: %s", command_template)
             # コマンドテンプレートがない場合は、ベーステンプレートのみ返す
             return base_content if base_content else None
         
         # 両方を結合（ベース + 改行 + コマンド）
         if base_content:
             combined = base_content + "\n\n" + command_content
-            logger.info(f"Combined templates: {base_template} + {command_template}")
+            logger.debug("Combined templates: %s + %s", base_template, command_template)
         else:
             combined = command_content
             
@@ -104,19 +345,52 @@ class PromptTemplateLoader:
         Returns:
             変数置換後のテンプレート内容
         """
+        format_string = self._get_format_string(template_content)
         try:
-            template = Template(template_content)
-            # Noneの値を空文字列に変換
-            safe_variables = {k: (v if v is not None else '') for k, v in variables.items()}
-            return template.safe_substitute(safe_variables)
-        except Exception as e:
-            logger.error(f"Error rendering template: {e}")
+            return format_string.format_map(_RenderVariables(variables))
+        except ValueError as e:
+            logger.error("Error rendering template: %s", e)
             return template_content
+    
+    def _get_format_string(self, template_content: str) -> str:
+        """
+        string.Template形式のテンプレートをformat_map用の文字列に変換（結果はキャッシュ）
+        
+        Args:
+            template_content: テンプレート内容
+            
+        Returns:
+            format_map用の文字列（${name}→{name}、$name→{$name}）
+        """
+        cached = self._format_cache.get(template_content)
+        if cached is not None:
+            return cached
+        
+        parts = []
+        position = 0
+        for match in Template.pattern.finditer(template_content):
+            # プレースホルダー以外の波括弧はエスケープする
+            parts.append(template_content[position:match.start()].replace('{', '{{').replace('}', '}}'))
+            if match.group('braced') is not None:
+                parts.append('{' + match.group('braced') + '}')
+            elif match.group('named') is not None:
+                parts.append('{$' + match.group('named') + '}')
+            else:
+                # $$および不正な$はsafe_substituteと同様に$として出力する
+                parts.append('$')
+            position = match.end()
+        parts.append(template_content[position:].replace('{', '{{').replace('}', '}}'))
+        
+        format_string = ''.join(parts)
+        self._format_cache[template_content] = format_string
+        return format_string
 
 
 class ClaudeContextManager:
     """Claude Codeへのコンテキストとプロンプトを管理するクラス"""
     
+    __slots__ = ('sdd_path', '_sdd_path_str', 'template_loader', '_stage_table')
+    
     def __init__(self, sdd_path: Optional[Path] = None, prompts_dir: Optional[Path] = None):
         """
         初期化
@@ -130,9 +404,23 @@ class ClaudeContextManager:
             self.sdd_path = Path(__file__).parent.parent / "docs" / "SDD.md"
         else:
             self.sdd_path = sdd_path
+        # プロンプトに埋め込む文字列表現（毎回のPath→str変換を避ける）
+        self._sdd_path_str = str(self.sdd_path)
             
         # テンプレートローダーを初期化
         self.template_loader = PromptTemplateLoader(prompts_dir)
+        # ステージ別テンプレートは起動時に読み込んでおく（以降はmtimeが変わった場合のみ再読込）
+        self.template_loader.preload_templates(_PRELOAD_TEMPLATES)
+        
+        # ステージ別の設定表（デフォルトプロンプトにはインスタンス内で不変なsdd_pathを先に埋め込んでおく）
+        self._stage_table: Dict[str, _StageConfig] = {
+            stage: config._replace(default_prompt=config.default_prompt.format(
+                sdd_path=self._sdd_path_str.replace('{', '{{').replace('}', '}}'),
+                idea_name='{idea_name}',
+                parent_content='{parent_content}'
+            ))
+            for stage, config in _STAGE_CONFIGS.items()
+        }
         
         logger.info(f"ClaudeContextManager initialized with SDD path: {self.sdd_path}")
     
@@ -151,30 +439,34 @@ class ClaudeContextManager:
         Returns:
             フォーマットされた初期コンテキストメッセージ
         """
-        context_lines = [
-            "=== Discord スレッド情報 ===",
-            f"チャンネル名: {thread_info.get('channel_name', 'Unknown')}",
-            f"スレッド名: {thread_info.get('thread_name', 'Unknown')}",
-            f"スレッドID: {thread_info.get('thread_id', 'Unknown')}",
-            f"セッション番号: {session_num}",
-            "",
-            "【重要】このセッションはDiscordのスレッド専用です。",
-            f"メッセージ送信は: dp {session_num} \"メッセージ\"",
-            ""
-        ]
+        channel_name = thread_info.get('channel_name', 'Unknown')
+        thread_name = thread_info.get('thread_name', 'Unknown')
+        thread_id = thread_info.get('thread_id', 'Unknown')
+        
+        context = (
+            f"{_CONTEXT_HEADER}"
+            f"チャンネル名: {channel_name}\n"
+            f"スレッド名: {thread_name}\n"
+            f"スレッドID: {thread_id}\n"
+            f"セッション番号: {session_num}\n"
+            f"{_CONTEXT_NOTICE}"
+            f"メッセージ送信は: dp {session_num} \"メッセージ\"\n"
+        )
         
         # 親メッセージがある場合は追加
-        if parent_message:
-            context_lines.extend([
-                "=== 親メッセージ ===",
-                f"作成者: {parent_message.get('author', 'Unknown')}",
-                f"時刻: {parent_message.get('timestamp', 'Unknown')}",
-                f"内容:",
-                parent_message.get('content', ''),
-                "==================="
-            ])
-        
-        return "\n".join(context_lines)
+        if not parent_message:
+            return context
+        
+        author = parent_message.get('author', 'Unknown')
+        timestamp = parent_message.get('timestamp', 'Unknown')
+        content = parent_message.get('content', '')
+        return (
+            f"{context}{_PARENT_HEADER}"
+            f"作成者: {author}\n"
+            f"時刻: {timestamp}\n"
+            f"内容:\n{content}\n"
+            f"{_PARENT_FOOTER}"
+        )
     
     def generate_idea_prompt(self, idea_name: str, parent_content: str, 
                             thread_info: Dict[str, str] = None,
@@ -285,7 +577,7 @@ class ClaudeContextManager:
                              thread_info: Dict[str, str] = None,
                              session_num: int = None,
                              parent_content: str = None,
-                             default_prompt: str = None) -> str:
+                             default_prompt: Optional[str] = None) -> str:
         """
         プロンプト生成の共通ロジック
         
@@ -297,6 +589,7 @@ class ClaudeContextManager:
             session_num: セッション番号
             parent_content: 親メッセージの内容（ideaステージ用）
             default_prompt: テンプレートが存在しない場合のデフォルトプロンプト
+                            （{idea_name}/{parent_content}を含むstr.format形式、必要な時だけ置換する）
             
         Returns:
             生成されたプロンプト
@@ -306,21 +599,24 @@ class ClaudeContextManager:
         
         if template_content:
             # テンプレートが存在する場合は変数を置換
+            thread_info = thread_info or _EMPTY_DICT
             variables = {
                 'idea_name': idea_name,
-                'sdd_path': str(self.sdd_path),
-                'channel_name': thread_info.get('channel_name', '') if thread_info else '',
-                'thread_name': thread_info.get('thread_name', '') if thread_info else '',
-                'thread_id': thread_info.get('thread_id', '') if thread_info else '',
-                'session_num': session_num if session_num else '',
-                'author': thread_info.get('author', '') if thread_info else '',
-                'created_at': thread_info.get('created_at', '') if thread_info else '',
-                'parent_content': parent_content if parent_content else thread_info.get('parent_content', '') if thread_info else ''
+                'sdd_path': self._sdd_path_str,
+                'channel_name': thread_info.get('channel_name', ''),
+                'thread_name': thread_info.get('thread_name', ''),
+                'thread_id': thread_info.get('thread_id', ''),
+                'session_num': session_num or '',
+                'author': thread_info.get('author', ''),
+                'created_at': thread_info.get('created_at', ''),
+                'parent_content': parent_content or thread_info.get('parent_content', '')
             }
             return self.template_loader.render_template(template_content, variables)
         else:
             # テンプレートが存在しない場合はデフォルトを使用
-            return default_prompt if default_prompt else f"No template found for {stage} stage"
+            if not default_prompt:
+                return f"No template found for {stage} stage"
+            return default_prompt.format_map({'idea_name': idea_name, 'parent_content': parent_content or ''})
     
     def generate_prompt(self, stage: str, idea_name: str, **kwargs) -> str:
         """
@@ -334,90 +630,25 @@ class ClaudeContextManager:
         Returns:
             生成されたプロンプト
         """
-        # ステージ別の設定を取得
-        stage_configs = {
-            'idea': {
-                'template_path': 'idea.md',
-                'requires_parent_content': True,
-                'default_prompt': f"""親メッセージの内容をもとに、./projects/{idea_name}/idea.mdに企画提案書を記載してください。
-
-親メッセージ:
-{kwargs.get('parent_content', '')}
-
-以下の要素を含めて、マークダウン形式で記載してください：
-- プロジェクトの概要
-- 解決したい課題
-- 提案する解決策
-- 期待される効果
-- 実装の概要（技術的な観点）"""
-            },
-            'requirements': {
-                'template_path': 'complete/requirements.md',
-                'default_prompt': f"""./projects/{idea_name}/idea.mdを読んで、{self.sdd_path}のRequirement Gatheringセクションに従って./projects/{idea_name}/requirements.mdに要件定義を記載してください.
-
-具体的には以下の形式で記載してください：
-
-1. Introduction セクション
-   - 機能の概要を明確に記述
-
-2. Requirements セクション
-   - 各要件を階層的な番号付きリストで記載
-   - 各要件には以下を含める：
-     - User Story: "As a [role], I want [feature], so that [benefit]" 形式
-     - Acceptance Criteria: EARS形式（Easy Approach to Requirements Syntax）で記載
-       - WHEN [event] THEN [system] SHALL [response]
-       - IF [precondition] THEN [system] SHALL [response]
-
-エッジケース、ユーザー体験、技術的制約、成功基準を考慮して、包括的な要件を定義してください。"""
-            },
-            'design': {
-                'template_path': 'complete/design.md',
-                'default_prompt': f"""./projects/{idea_name}/requirements.mdを読んで、{self.sdd_path}のDesignセクションに従って./projects/{idea_name}/design.mdに設計書を記載してください。
-
-具体的には以下のセクションを含めてください：
-- Overview: 設計の概要
-- Architecture: システムアーキテクチャ
-- Components and Interfaces: コンポーネントとインターフェース
-- Data Models: データモデル
-- Error Handling: エラーハンドリング
-- Testing Strategy: テスト戦略
-
-必要に応じてMermaidダイアグラムを使用してください。"""
-            },
-            'tasks': {
-                'template_path': 'complete/tasks.md',
-                'default_prompt': f"""./projects/{idea_name}/design.mdを読んで、{self.sdd_path}のTask Listセクションに従って./projects/{idea_name}/tasks.mdに実装タスクリストを記載してください。
-
-具体的には以下の形式で記載してください：
-- タスクをチェックボックスリスト形式で作成
-- 各タスクは具体的で実行可能なコーディングタスク
-- タスクは段階的に実装できるよう順序立てる
-- 各タスクに要件への参照を含める"""
-            },
-            'development': {
-                'template_path': 'complete/development.md',
-                'default_prompt': f"""./projects/{idea_name}/tasks.mdのタスクリストに従って開発を進めてください。
-
-作業ディレクトリ: ./development/{idea_name}/
-
-タスクを順番に実装し、テスト駆動開発のアプローチを採用してください。"""
-            }
-        }
-        
-        config = stage_configs.get(stage, {})
+        config = self._stage_table.get(stage)
+        parent_content = kwargs.get('parent_content')
         
-        # ステージ別の処理
-        if stage == 'idea' and config.get('requires_parent_content') and 'parent_content' not in kwargs:
-            raise ValueError("parent_content is required for idea stage")
+        if config is None:
+            # 未知のステージはステージ名のテンプレートのみを探す
+            template_path, default_prompt = f'{stage}.md', None
+        else:
+            if config.requires_parent_content and 'parent_content' not in kwargs:
+                raise ValueError(f"parent_content is required for {stage} stage")
+            template_path, default_prompt = config.template_path, config.default_prompt
         
         return self._generate_prompt_base(
-            template_path=config.get('template_path', f'{stage}.md'),
+            template_path=template_path,
             idea_name=idea_name,
             stage=stage,
             thread_info=kwargs.get('thread_info'),
             session_num=kwargs.get('session_num'),
-            parent_content=kwargs.get('parent_content'),
-            default_prompt=config.get('default_prompt')
+            parent_content=parent_content,
+            default_prompt=default_prompt
         )
     
     def format_complete_message(self, stage: str, idea_name: str) -> str:
@@ -431,14 +662,7 @@ class ClaudeContextManager:
         Returns:
             次チャンネルへの投稿メッセージ
         """
-        stage_messages = {
-            "idea": f"要件定義: {idea_name}",
-            "requirements": f"設計: {idea_name}",
-            "design": f"タスクリスト作成: {idea_name}",
-            "tasks": f"開発: {idea_name}"
-        }
-        
-        return stage_messages.get(stage, f"次フェーズ: {idea_name}")
+        return _NEXT_STAGE_LABELS.get(stage, _DEFAULT_NEXT_STAGE_LABEL) + idea_name
     
     def get_stage_from_channel(self, channel_name: str) -> Optional[str]:
         """
@@ -450,17 +674,4 @@ class ClaudeContextManager:
         Returns:
             ステージ名（idea, requirements, design, tasks, development）
         """
-        channel_stage_map = {
-            "1-idea": "idea",
-            "2-requirements": "requirements",
-            "3-design": "design",
-            "4-tasks": "tasks",
-            "5-development": "development"
-        }
-        
-        # チャンネル名から番号とステージ名を抽出
-        for key, stage in channel_stage_map.items():
-            if key in channel_name:
-                return stage
-        
-        return None
\ No newline at end of file
+        return _resolve_stage(channel_name)
\ No newline at end of file
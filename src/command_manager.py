@@ -10,24 +10,213 @@ Command Manager - !completeコマンドのワークフロー管理
 """
 
 import asyncio
-import subprocess
+import functools
 import logging
 import json
+import shutil
 import urllib.parse
 from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import discord
 
+from src.claude_context_manager import STAGE_TO_CHANNEL
 from src.prompt_sender import get_prompt_sender
+from src.project_manager import DEFAULT_BRANCH
+from src.session_manager import get_session_manager
 from lib.command_executor import async_run
 
 logger = logging.getLogger(__name__)
 
+# git pushのタイムアウト秒数（ネットワークが停滞した場合にTCPタイムアウトまで待たない）
+_PUSH_TIMEOUT = 60
+
+# Claude Codeの入力欄の下に表示されるヘルプ（tmux画面にこれが出たら起動完了とみなす）
+_CLAUDE_READY_MARKER = "? for shortcuts"
+
+# Claude Codeの起動確認の間隔（秒）
+_CLAUDE_READY_POLL_INTERVAL = 0.25
+
+# git pushの失敗のうち、リモートリポジトリ側の問題を示すメッセージ
+_PUSH_REMOTE_ERRORS = (
+    "Could not read from remote repository",
+    "fatal: 'origin' does not appear",
+    "Permission denied",
+    "fatal: unable to access"
+)
+
+
+async def _gather_or_cancel(*aws):
+    """
+    asyncio.gatherと同様に並行実行し、いずれかが例外で終了した場合は残りをキャンセルする
+    
+    Python 3.11のasyncio.TaskGroupと同じ後始末（残りのタスクを放置しない）を3.8でも行う。
+    
+    Args:
+        *aws: 並行実行するコルーチン・タスク
+    
+    Returns:
+        各awaitableの結果のリスト（引数の順）
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        await _cancel_tasks(tasks)
+        raise
+
+
+async def _cancel_tasks(tasks):
+    """
+    タスクをキャンセルし、完了を待つ（完了済みのタスクの例外もここで回収する）
+    
+    Args:
+        tasks: キャンセルするタスクのリスト
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run_in_thread(func, *args):
+    """
+    ブロッキングな処理をスレッドプールで実行（Python 3.8にはasyncio.to_threadが無いため）
+    
+    Args:
+        func: 実行する関数
+        *args: 関数の引数
+    
+    Returns:
+        関数の戻り値
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, func, *args)
+
+
+@functools.lru_cache(maxsize=256)
+def _explorer_link(relative_path: str) -> str:
+    """
+    相対パスからOnline ExplorerのURLを生成（同じプロジェクトのリンクは繰り返し生成されるため結果をキャッシュする）
+    
+    Args:
+        relative_path: /home/ubuntu/からの相対パス
+    
+    Returns:
+        Online ExplorerのURL
+    """
+    # URLエンコード（/を%2Fに変換）
+    encoded_path = urllib.parse.quote(relative_path, safe='')
+    return f"http://3.15.213.192:3456/?path={encoded_path}"
+
+
+def _load_json(path: Path) -> dict:
+    """
+    JSONファイルを読み込む（ブロッキングI/Oのため_run_in_threadから呼ぶ）
+    
+    Args:
+        path: JSONファイルのパス
+    
+    Returns:
+        解析したJSONの内容
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _touch_if_missing(path: Path) -> None:
+    """
+    ファイルが無い場合のみ空ファイルを作成（既存ファイルのmtimeは更新しない）
+    
+    Args:
+        path: 作成するファイルのパス
+    """
+    try:
+        path.touch(exist_ok=False)
+    except FileExistsError:
+        pass
+
+
+def _origin_absent_in_config(repo_path: Path) -> bool:
+    """
+    .git/configを読み、originが未設定だと確定できるか判定
+    
+    Args:
+        repo_path: リポジトリのパス
+    
+    Returns:
+        originが未設定と確定できる場合True（設定の読み込みに失敗した場合やincludeがある場合はFalse）
+    """
+    try:
+        text = (repo_path / ".git" / "config").read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return False
+    return '[remote "origin"]' not in text and "[include" not in text
+
+
+class _ProgressMessage:
+    """
+    進捗表示用メッセージの編集をまとめるラッパー
+    
+    途中経過の編集はバックグラウンドで送信して処理を待たせず、送信中に届いた途中経過は最新のものだけを送る。
+    最終結果の編集は送信中の途中経過の後に反映される。
+    """
+    
+    def __init__(self, message: discord.Message):
+        """
+        初期化
+        
+        Args:
+            message: 編集対象のDiscordメッセージ
+        """
+        self._message = message
+        self._pending: Optional[str] = None
+        self._task: Optional[asyncio.Future] = None
+    
+    def set(self, content: str) -> None:
+        """
+        途中経過を表示（完了を待たない）
+        
+        Args:
+            content: 表示内容
+        """
+        self._pending = content
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._flush_pending())
+    
+    async def _flush_pending(self) -> None:
+        """未送信の途中経過がなくなるまで最新の内容を送信"""
+        while self._pending is not None:
+            content, self._pending = self._pending, None
+            try:
+                await self._message.edit(content=content)
+            except discord.HTTPException as e:
+                # 途中経過の表示失敗は処理を止めない
+                logger.warning(f"Failed to update progress message: {e}")
+    
+    async def edit(self, content: str) -> None:
+        """
+        最終結果を表示（送信中の途中経過の完了を待ってから編集する）
+        
+        Args:
+            content: 表示内容
+        """
+        self._pending = None
+        if self._task is not None:
+            await self._task
+        await self._message.edit(content=content)
+
 
 class CommandManager:
     """!completeコマンドのワークフローを管理するクラス"""
     
+    # !complete時の現在ステージ→次ステージ
+    _STAGE_TRANSITIONS = {
+        "idea": "requirements",
+        "requirements": "design",
+        "design": "tasks",
+        "tasks": "development"
+    }
+    
     def __init__(self, bot, settings):
         """
         初期化
@@ -40,13 +229,39 @@ class CommandManager:
         self.settings = settings
         self.prompt_sender = get_prompt_sender(flask_port=settings.get_port('flask'))
         
-        # チャンネル別ハンドラーのマッピング
+        # asyncioのロック・セマフォはPython 3.8/3.9ではイベントループ外で作成すると
+        # bot.run()のループとは別のループに束縛されるため、初回利用時に作成する
+        
+        # git/ghサブプロセスの同時実行数の上限（同時に!completeされた場合のfork集中を防ぐ）
+        self._git_concurrency = settings.get_git_concurrency()
+        self._git_semaphore: Optional[asyncio.Semaphore] = None
+        
+        # GitHubユーザー名のキャッシュ（gh api userの呼び出しは最初の1回のみ）
+        self._github_user: Optional[str] = None
+        self._github_user_lock: Optional[asyncio.Lock] = None
+        
+        # リポジトリパス→originリモートの有無（リモートを変更した場合は破棄する）
+        self._remote_cache: Dict[str, bool] = {}
+        
+        # projectsリポジトリの準備完了フラグ（初期化は一度だけ行う）
+        self._projects_repo_ready = False
+        self._projects_repo_init_lock: Optional[asyncio.Lock] = None
+        
+        # 次ステージのセッション開始時に送るプロンプトの生成メソッド
+        context_manager = bot.context_manager
+        self._prompt_generators = {
+            "requirements": context_manager.generate_requirements_prompt,
+            "design": context_manager.generate_design_prompt,
+            "tasks": context_manager.generate_tasks_prompt
+        }
+        
+        # ステージ別ハンドラーのマッピング（ステージはチャンネル名からcontext_managerで判定済み）
         self.workflow_channels = {
-            "1-idea": self.handle_idea_complete,
-            "2-requirements": self.handle_requirements_complete,
-            "3-design": self.handle_design_complete,
-            "4-tasks": self.handle_tasks_complete,
-            "5-development": self.handle_development_complete
+            "idea": self.handle_idea_complete,
+            "requirements": self.handle_requirements_complete,
+            "design": self.handle_design_complete,
+            "tasks": self.handle_tasks_complete,
+            "development": self.handle_development_complete
         }
     
     async def process_complete_command(self, ctx) -> None:
@@ -70,12 +285,7 @@ class CommandManager:
             return
         
         # 対応するハンドラーを実行
-        handler = None
-        for key, func in self.workflow_channels.items():
-            if key in channel_name:
-                handler = func
-                break
-        
+        handler = self.workflow_channels.get(stage)
         if handler:
             await handler(ctx)
         else:
@@ -100,139 +310,119 @@ class CommandManager:
             # すでに相対パスの場合
             relative_path = project_path.lstrip('/')
         
-        # URLエンコード（/を%2Fに変換）
-        encoded_path = urllib.parse.quote(relative_path, safe='')
-        
-        return f"http://3.15.213.192:3456/?path={encoded_path}"
+        return _explorer_link(relative_path)
     
     async def handle_idea_complete(self, ctx) -> None:
         """#1-ideaでの!complete処理"""
-        thread_name = ctx.channel.name
-        loading_msg = await ctx.send("`...` 処理中...")
-        
-        try:
-            # プロジェクトパスを取得
-            project_path = self.bot.project_manager.get_project_path(thread_name)
-            if not project_path.exists():
-                await loading_msg.edit(content=f"❌ プロジェクト `{thread_name}` が見つかりません")
-                return
-            
-            projects_root = self.bot.project_manager.projects_root
-            
-            # Git操作の実行（共通メソッド呼び出し）
-            if not await self._execute_git_workflow(
-                projects_root, thread_name, "idea", loading_msg
-            ):
-                return
-            
-            # 次ステージへの遷移（共通メソッド呼び出し）
-            await self._transition_to_next_stage(
-                ctx, thread_name, "idea", "requirements", 
-                project_path, loading_msg
-            )
-            
-        except Exception as e:
-            logger.error(f"Error in handle_idea_complete: {e}", exc_info=True)
-            await loading_msg.edit(content=f"❌ エラーが発生しました: {str(e)[:100]}")
+        await self._run_phase(ctx, "idea")
     
     async def handle_requirements_complete(self, ctx) -> None:
         """#2-requirementsでの!complete処理"""
-        thread_name = ctx.channel.name
-        loading_msg = await ctx.send("`...` 処理中...")
-        
-        try:
-            # プロジェクトパスを取得
-            project_path = self.bot.project_manager.get_project_path(thread_name)
-            projects_root = self.bot.project_manager.projects_root
-            
-            # Git操作の実行（共通メソッド呼び出し）
-            if not await self._execute_git_workflow(
-                projects_root, thread_name, "requirements", loading_msg
-            ):
-                return
-            
-            # 次ステージへの遷移（共通メソッド呼び出し）
-            await self._transition_to_next_stage(
-                ctx, thread_name, "requirements", "design", 
-                project_path, loading_msg
-            )
-            
-        except Exception as e:
-            logger.error(f"Error in handle_requirements_complete: {e}", exc_info=True)
-            await loading_msg.edit(content=f"❌ エラーが発生しました: {str(e)[:100]}")
+        await self._run_phase(ctx, "requirements")
     
     async def handle_design_complete(self, ctx) -> None:
         """#3-designでの!complete処理"""
-        thread_name = ctx.channel.name
-        loading_msg = await ctx.send("`...` 処理中...")
-        
-        try:
-            # プロジェクトパスを取得
-            project_path = self.bot.project_manager.get_project_path(thread_name)
-            projects_root = self.bot.project_manager.projects_root
-            
-            # Git操作の実行（共通メソッド呼び出し）
-            if not await self._execute_git_workflow(
-                projects_root, thread_name, "design", loading_msg
-            ):
-                return
-            
-            # 次ステージへの遷移（共通メソッド呼び出し）
-            await self._transition_to_next_stage(
-                ctx, thread_name, "design", "tasks", 
-                project_path, loading_msg
-            )
-            
-        except Exception as e:
-            logger.error(f"Error in handle_design_complete: {e}", exc_info=True)
-            await loading_msg.edit(content=f"❌ エラーが発生しました: {str(e)[:100]}")
+        await self._run_phase(ctx, "design")
     
     async def handle_tasks_complete(self, ctx) -> None:
         """#4-tasksでの!complete処理（GitHub リポジトリ作成を含む）"""
+        await self._run_phase(ctx, "tasks")
+    
+    async def _run_phase(self, ctx, stage: str) -> None:
+        """
+        idea〜tasksステージ共通の!complete処理
+        
+        Git操作の後、次ステージのチャンネルにスレッドを作成してセッションを引き継ぐ。
+        tasksステージでは開発環境（GitHubリポジトリ）のセットアップも行う。
+        
+        Args:
+            ctx: Discordコマンドコンテキスト
+            stage: 現在のステージ（idea, requirements, design, tasks）
+        """
+        project_manager = self.bot.project_manager
+        
         thread_name = ctx.channel.name
-        loading_msg = await ctx.send("`...` 処理中...")
+        loading_msg = _ProgressMessage(await ctx.send("`...` 処理中..."))
         
         try:
-            # プロジェクトパスを取得
-            project_path = self.bot.project_manager.get_project_path(thread_name)
-            projects_root = self.bot.project_manager.projects_root
-            
-            # 1. 通常のGit操作（共通メソッド呼び出し）
-            if not await self._execute_git_workflow(
-                projects_root, thread_name, "tasks", loading_msg
-            ):
+            # プロジェクトパスを取得（存在確認はイベントループ外で行う）
+            project_path = project_manager.get_project_path(thread_name)
+            if not await _run_in_thread(project_path.exists):
+                await loading_msg.edit(content=f"❌ プロジェクト `{thread_name}` が見つかりません")
                 return
             
-            # 2. 開発環境セットアップ（tasks特有の処理）
-            dev_path, github_url = await self._setup_development_environment(
-                thread_name, loading_msg
-            )
-            if not dev_path:
-                return  # エラーメッセージは既に表示済み
-            
-            # 3. 次ステージへの遷移（開発用の特別なセッション設定）
-            next_message = self.bot.context_manager.format_complete_message("tasks", thread_name)
-            next_channel = self.bot.channel_validator.get_required_channel(ctx.guild, "development")
+            projects_root = project_manager.projects_root
             
-            if not next_channel:
-                await loading_msg.edit(content="❌ #5-developmentチャンネルが見つかりません")
+            # Git操作の実行（開発ステージへ進む場合は、開発環境セットアップで使うGitHubユーザー名の取得を並行して済ませておく）
+            next_stage = self._STAGE_TRANSITIONS[stage]
+            git_workflow = self._execute_git_workflow(
+                projects_root, thread_name, stage, loading_msg
+            )
+            if next_stage == "development":
+                success, github_user = await _gather_or_cancel(git_workflow, self._get_github_user())
+                if success and github_user == "unknown":
+                    # ghが未認証の場合は開発ディレクトリの作成前に中断する（取得できたユーザー名はキャッシュされる）
+                    await loading_msg.edit(
+                        content="❌ GitHubユーザーを取得できませんでした\n`gh auth login`で認証を確認してください"
+                    )
+                    return
+            else:
+                success = await git_workflow
+            if not success:
                 return
             
-            message = await next_channel.send(next_message)
-            thread = await message.create_thread(name=thread_name)
+            # 次ステージへの遷移
+            if next_stage == "development":
+                await self._transition_to_development(ctx, thread_name, loading_msg)
+            else:
+                await self._transition_to_next_stage(
+                    ctx, thread_name, stage, next_stage,
+                    project_path, loading_msg
+                )
             
-            # 開発用セッションの設定（作業ディレクトリは開発ディレクトリ）
-            await self._setup_development_session(
+        except Exception as e:
+            # トレースバックの整形はデバッグログが有効な場合のみ行う
+            logger.error("handle_%s_complete failed: %r", stage, e)
+            logger.debug("handle_%s_complete traceback", stage, exc_info=True)
+            await loading_msg.edit(content=f"❌ エラーが発生しました: {str(e)[:100]}")
+    
+    async def _transition_to_development(self, ctx, thread_name: str, loading_msg: _ProgressMessage) -> None:
+        """
+        tasksステージから開発ステージへの遷移処理（開発環境のセットアップを含む）
+        
+        Args:
+            ctx: コマンドコンテキスト
+            thread_name: スレッド名（プロジェクト名）
+            loading_msg: 進捗表示用メッセージ
+        """
+        # 開発環境セットアップ（tasks特有の処理）
+        dev_path, github_url = await self._setup_development_environment(
+            thread_name, loading_msg
+        )
+        if not dev_path:
+            return  # エラーメッセージは既に表示済み
+        
+        # 次ステージへの遷移（開発用の特別なセッション設定）
+        next_message = self.bot.context_manager.format_complete_message("tasks", thread_name)
+        next_channel = self.bot.channel_validator.get_required_channel(ctx.guild, "development")
+        
+        if not next_channel:
+            await loading_msg.edit(content="❌ #5-developmentチャンネルが見つかりません")
+            return
+        
+        message = await next_channel.send(next_message)
+        thread = await message.create_thread(name=thread_name)
+        
+        # Online Explorerリンクを生成（開発ディレクトリ用）
+        explorer_link = self._generate_online_explorer_link(str(dev_path))
+        
+        # 開発用セッションの設定（作業ディレクトリは開発ディレクトリ）と成功メッセージの表示を並行して実行
+        # （片方が失敗した場合はもう片方をキャンセルし、失敗したままセッションを起動し続けないようにする）
+        await _gather_or_cancel(
+            self._setup_development_session(
                 thread, thread_name, str(dev_path), github_url
-            )
-            
-            # 現在のセッションを終了
-            await self._terminate_current_session(ctx)
-            
-            # Online Explorerリンクを生成（開発ディレクトリ用）
-            explorer_link = self._generate_online_explorer_link(str(dev_path))
-            
-            await loading_msg.edit(
+            ),
+            loading_msg.edit(
                 content=(
                     f"✅ **tasks** フェーズが完了しました！\n"
                     f"📂 プロジェクト: `{thread_name}`\n"
@@ -242,10 +432,10 @@ class CommandManager:
                     f"➡️ 次フェーズ: {next_channel.mention}"
                 )
             )
-            
-        except Exception as e:
-            logger.error(f"Error in handle_tasks_complete: {e}", exc_info=True)
-            await loading_msg.edit(content=f"❌ エラーが発生しました: {str(e)[:100]}")
+        )
+        
+        # 現在のセッションを終了
+        await self._terminate_current_session(ctx)
 
     async def handle_development_complete(self, ctx) -> None:
         """
@@ -263,7 +453,7 @@ class CommandManager:
         
         # プロジェクトディレクトリに移動
         project_dir = Path(f"../{thread_name}")
-        if not project_dir.exists():
+        if not await _run_in_thread(project_dir.exists):
             await ctx.send(f"❌ プロジェクトディレクトリが見つかりません: {project_dir}")
             return
         
@@ -305,20 +495,23 @@ class CommandManager:
                 await ctx.send(f"⚠️ Git addに失敗: {add_result.stderr}")
                 return False
             
-            # git commit
-            commit_result = subprocess.run(
-                ["git", "commit", "-m", "Deploy to Vercel"],
-                cwd=project_dir,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            # ステージされた変更の有無は成功フラグで判定（出力の文字列は解析しない。イベントループは止めない）
+            nothing_staged, _ = await self._execute_git(project_dir, ["git", "diff", "--cached", "--quiet"])
             
-            if commit_result.returncode != 0:
-                # nothing to commitの場合は続行
-                if "nothing to commit" in commit_result.stderr.lower() or "nothing to commit" in commit_result.stdout.lower():
-                    await ctx.send("ℹ️ コミットする変更がありません。最新の状態でデプロイします。")
-                else:
+            if nothing_staged:
+                # コミットする変更が無い場合は続行
+                await ctx.send("ℹ️ コミットする変更がありません。最新の状態でデプロイします。")
+            else:
+                # git commit
+                commit_result = subprocess.run(
+                    ["git", "commit", "-m", "Deploy to Vercel"],
+                    cwd=project_dir,
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+                
+                if commit_result.returncode != 0:
                     await ctx.send(f"⚠️ Git commitに失敗: {commit_result.stderr}")
                     return False
             
@@ -432,7 +625,7 @@ class CommandManager:
         projects_root: Path,
         thread_name: str,
         phase_name: str,
-        loading_msg: discord.Message
+        loading_msg: _ProgressMessage
     ) -> bool:
         """
         Git操作の共通ワークフロー実行
@@ -449,44 +642,128 @@ class CommandManager:
         Raises:
             なし（エラーはFalseを返すことで処理）
         """
-        # Gitリポジトリの存在確認
-        if not (projects_root / ".git").exists():
-            success, output = await self.bot.project_manager.init_git_repository(projects_root)
-            if not success:
-                await loading_msg.edit(content=f"❌ Git初期化エラー:\n```\n{output}\n```")
-                return False
-            
-            # 初回の場合、リモートリポジトリを設定
-            await loading_msg.edit(content="`...` プロジェクトリポジトリを設定中...")
-            await self._setup_projects_remote(projects_root, loading_msg)
-        
-        # Git操作コマンドの定義
-        git_commands = [
-            ["git", "add", "."],  # projects全体をステージング
-            ["git", "commit", "-m", f"[{thread_name}] Complete {phase_name} phase"]
-        ]
+        project_manager = self.bot.project_manager
+        execute_git = self._execute_git
         
-        # リモート確認とpush追加
-        has_remote = await self._check_git_remote(projects_root)
-        if has_remote:
-            git_commands.append(["git", "push"])
+        # Gitリポジトリの準備（初回のみ）
+        if not await self._ensure_projects_repo(projects_root, loading_msg):
+            return False
+        
+        # projects全体のステージングとリモート確認は互いに依存しないため並行して実行
+        add_cmd = ["git", "add", "."]
+        (success, output), has_remote = await _gather_or_cancel(
+            execute_git(projects_root, add_cmd),
+            self._check_git_remote(projects_root)
+        )
+        if not success:
+            await self._report_git_error(loading_msg, add_cmd, output)
+            return False
+        
+        # ステージされた変更が無ければコミット・プッシュともスキップ（exit 0は変更なし）
+        no_changes, _ = await execute_git(projects_root, ["git", "diff", "--cached", "--quiet"])
+        if no_changes:
+            # 直後に完了メッセージで上書きされるため、Discordへの表示はせずログのみ
+            logger.info("Nothing to commit, continuing...")
+            return True
+        
+        commit_cmd = ["git", "commit", "-m", f"[{thread_name}] Complete {phase_name} phase"]
+        success, output = await execute_git(projects_root, commit_cmd)
+        if not success:
+            await self._report_git_error(loading_msg, commit_cmd, output)
+            return False
         
-        # コマンド実行
-        for cmd in git_commands:
-            success, output = await self.bot.project_manager.execute_git_command(projects_root, cmd)
+        # リモートがあればpush（失敗は警告のみ）
+        if has_remote:
+            success, output = await execute_git(projects_root, ["git", "push"], timeout=_PUSH_TIMEOUT)
             if not success:
-                # pushエラーの場合は警告のみ
-                if cmd[1] == "push":
-                    logger.warning(f"Git push failed (may not have remote): {output}")
-                # commitエラーで「nothing to commit」の場合は警告のみ
-                elif cmd[1] == "commit" and "nothing to commit" in output.lower():
-                    logger.info("Nothing to commit, continuing...")
-                    await loading_msg.edit(content="`...` コミットする変更がありません。次のステップに進みます...")
-                    break  # commitがスキップされたらpushもスキップ
-                else:
-                    error_detail = output if output else f"Command failed: {' '.join(cmd)}"
-                    await loading_msg.edit(content=f"❌ Gitエラー:\n```\n{error_detail}\n```")
+                logger.warning(f"Git push failed (may not have remote): {output}")
+        
+        return True
+    
+    def _git_slots(self) -> asyncio.Semaphore:
+        """git/ghサブプロセスの同時実行数を制限するセマフォを取得（初回利用時に作成）"""
+        if self._git_semaphore is None:
+            self._git_semaphore = asyncio.Semaphore(self._git_concurrency)
+        return self._git_semaphore
+    
+    async def _execute_git(self, path: Path, cmd: List[str],
+                           timeout: Optional[float] = None) -> Tuple[bool, str]:
+        """
+        同時実行数を制限してGitコマンドを実行
+        
+        Args:
+            path: リポジトリのパス
+            cmd: gitコマンド（例: ["git", "add", "."]）
+            timeout: タイムアウト秒数（None で無制限）
+        
+        Returns:
+            Tuple[bool, str]: (成功フラグ, 出力メッセージ)
+        """
+        async with self._git_slots():
+            return await self.bot.project_manager.execute_git_command(path, cmd, timeout=timeout)
+    
+    async def _run_git_tool(self, cmd: List[str], cwd: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        同時実行数を制限してghコマンドを実行
+        
+        Args:
+            cmd: 実行するコマンド
+            cwd: 作業ディレクトリ
+        
+        Returns:
+            Tuple[bool, str]: (成功フラグ, 出力メッセージ)
+        """
+        async with self._git_slots():
+            return await async_run(cmd, cwd=cwd)
+    
+    @staticmethod
+    async def _report_git_error(loading_msg: _ProgressMessage, cmd: List[str], output: str) -> None:
+        """
+        Gitコマンドの失敗を進捗表示用メッセージに表示
+        
+        Args:
+            loading_msg: 進捗表示用メッセージ
+            cmd: 失敗したGitコマンド
+            output: コマンドの出力
+        """
+        error_detail = output if output else f"Command failed: {' '.join(cmd)}"
+        await loading_msg.edit(content=f"❌ Gitエラー:\n```\n{error_detail}\n```")
+    
+    async def _ensure_projects_repo(self, projects_root: Path, loading_msg: _ProgressMessage) -> bool:
+        """
+        projectsディレクトリのGitリポジトリを準備（初回のみ初期化とリモート設定を行う）
+        
+        準備済みになった後は確認を行わない。同時に複数の!completeが実行されても
+        初期化（gh repo create）は一度だけ行われる。
+        
+        Args:
+            projects_root: プロジェクトのルートディレクトリ
+            loading_msg: 進捗表示用メッセージ
+        
+        Returns:
+            bool: リポジトリが利用可能な場合True、初期化に失敗した場合False
+        """
+        if self._projects_repo_ready:
+            return True
+        
+        if self._projects_repo_init_lock is None:
+            self._projects_repo_init_lock = asyncio.Lock()
+        async with self._projects_repo_init_lock:
+            # ロック待ちの間に他のタスクが準備済みにしている場合
+            if self._projects_repo_ready:
+                return True
+            
+            if not await _run_in_thread((projects_root / ".git").exists):
+                success, output = await self.bot.project_manager.init_git_repository(projects_root)
+                if not success:
+                    await loading_msg.edit(content=f"❌ Git初期化エラー:\n```\n{output}\n```")
                     return False
+                
+                # 初回の場合、リモートリポジトリを設定
+                loading_msg.set("`...` プロジェクトリポジトリを設定中...")
+                await self._setup_projects_remote(projects_root, loading_msg)
+            
+            self._projects_repo_ready = True
         
         return True
     
@@ -497,7 +774,7 @@ class CommandManager:
         current_stage: str,
         next_stage: str,
         project_path: Path,
-        loading_msg: discord.Message
+        loading_msg: _ProgressMessage
     ) -> bool:
         """
         次のステージへの遷移処理
@@ -519,47 +796,42 @@ class CommandManager:
         # 次チャンネル取得
         next_channel = self.bot.channel_validator.get_required_channel(ctx.guild, next_stage)
         if not next_channel:
-            stage_number = {
-                "requirements": "2",
-                "design": "3", 
-                "tasks": "4",
-                "development": "5"
-            }.get(next_stage, "?")
-            await loading_msg.edit(content=f"❌ #{stage_number}-{next_stage}チャンネルが見つかりません")
+            await loading_msg.edit(content=f"❌ #{STAGE_TO_CHANNEL[next_stage]}チャンネルが見つかりません")
             return False
         
         # メッセージ投稿とスレッド作成
         message = await next_channel.send(next_message)
         thread = await message.create_thread(name=thread_name)
         
-        # セッション管理の更新
-        await self._setup_next_stage_session(
-            thread, thread_name, next_stage, project_path
-        )
-        
-        # 現在のセッションを終了
-        await self._terminate_current_session(ctx)
-        
         # Online Explorerリンクを生成
         explorer_link = self._generate_online_explorer_link(str(project_path))
         
-        # 成功メッセージ（Online Explorerリンクを含む）
-        await loading_msg.edit(
-            content=(
-                f"✅ **{current_stage}** フェーズが完了しました！\n"
-                f"📂 プロジェクト: `{thread_name}`\n"
-                f"📍 パス: `{project_path}`\n"
-                f"🌐 ブラウザで確認: [Online Explorerで開く]({explorer_link})\n"
-                f"➡️ 次フェーズ: {next_channel.mention}"
+        # セッション管理の更新と成功メッセージ（Online Explorerリンクを含む）の表示は
+        # 互いに依存しないため並行して実行（片方が失敗した場合はもう片方をキャンセルする）
+        await _gather_or_cancel(
+            self._setup_next_stage_session(
+                thread, thread_name, next_stage, project_path
+            ),
+            loading_msg.edit(
+                content=(
+                    f"✅ **{current_stage}** フェーズが完了しました！\n"
+                    f"📂 プロジェクト: `{thread_name}`\n"
+                    f"📍 パス: `{project_path}`\n"
+                    f"🌐 ブラウザで確認: [Online Explorerで開く]({explorer_link})\n"
+                    f"➡️ 次フェーズ: {next_channel.mention}"
+                )
             )
         )
         
+        # 現在のセッションを終了
+        await self._terminate_current_session(ctx)
+        
         return True
     
     async def _setup_development_environment(
         self,
         thread_name: str,
-        loading_msg: discord.Message
+        loading_msg: _ProgressMessage
     ) -> Tuple[Optional[Path], Optional[str]]:
         """
         開発環境のセットアップ（tasksフェーズ専用）
@@ -571,147 +843,178 @@ class CommandManager:
         Returns:
             Tuple[Optional[Path], Optional[str]]: (開発パス, GitHub URL) or (None, None) if error
         """
+        project_manager = self.bot.project_manager
+        execute_git = self._execute_git
+        
+        # 途中で失敗した場合は作成した開発ディレクトリを削除し、!completeをやり直せるようにする
+        dev_path = None
+        completed = False
         try:
-            # 開発ディレクトリへのコピー
+            # 開発ディレクトリへのコピー（copytreeはイベントループ外で実行）
             try:
-                dev_path = self.bot.project_manager.copy_to_development(thread_name)
+                dev_path = await _run_in_thread(project_manager.copy_to_development, thread_name)
             except FileExistsError:
                 await loading_msg.edit(content=f"❌ 開発ディレクトリ `{thread_name}` は既に存在します")
                 return None, None
             
-            # GitHubワークフローのコピー
-            self.bot.project_manager.copy_github_workflows(thread_name)
-            
-            # 開発ディレクトリでGit初期化
-            success, output = await self.bot.project_manager.init_git_repository(dev_path)
+            # GitHubワークフローのコピー・開発ディレクトリでのGit初期化・GitHubユーザー名の取得は
+            # 互いに依存しないため並行して実行（ワークフローは.github配下のみで.gitには触れない）
+            _, (success, output), github_user = await _gather_or_cancel(
+                _run_in_thread(project_manager.copy_github_workflows, thread_name),
+                project_manager.init_git_repository(dev_path),
+                self._get_github_user()
+            )
             if not success:
                 await loading_msg.edit(content=f"❌ Git初期化エラー:\n```\n{output}\n```")
                 return None, None
             
-            # Serena MCPをプロジェクトに追加
-            serena_cmd = [
-                "claude", "mcp", "add", "serena",
-                "--scope", "project",
-                "--", "uvx", "--from", "git+https://github.com/oraios/serena",
-                "serena", "start-mcp-server",
-                "--context", "ide-assistant",
-                "--project", str(dev_path)
-            ]
-            success, output = await async_run(serena_cmd, cwd=str(dev_path))
-            if success:
-                logger.info(f"Serena MCP configured for project: {dev_path}")
-            else:
-                logger.warning(f"Failed to configure Serena MCP: {output}")
-            
-            # GitHubリポジトリ作成
+            # GitHubリポジトリ作成（ネットワーク待ち）とSerena MCP追加・初期コミット（ローカル処理）は
+            # pushまで互いに依存しないため並行実行
             create_repo_cmd = ["gh", "repo", "create", thread_name, "--public", "--source=.", "--remote=origin"]
-            success, output = await async_run(create_repo_cmd, cwd=str(dev_path))
-            
-            # GitHub ユーザー名取得
-            github_user = await self._get_github_user()
-            https_url = f"https://github.com/{github_user}/{thread_name}.git"
-            
-            if success:
-                # リモートURLをHTTPSに設定
-                set_url_cmd = ["git", "remote", "set-url", "origin", https_url]
-                success_url, output_url = await self.bot.project_manager.execute_git_command(dev_path, set_url_cmd)
-                
-                if success_url:
-                    logger.info(f"Remote URL set to HTTPS: {https_url}")
-                else:
-                    logger.warning(f"Failed to set HTTPS URL, keeping SSH: {output_url}")
+            (success, output), (commit_ok, committed) = await _gather_or_cancel(
+                self._run_git_tool(create_repo_cmd, cwd=str(dev_path)),
+                self._commit_development_files(dev_path, loading_msg)
+            )
+            if not commit_ok:
+                return None, None
             
-            elif "already exists" in output.lower():
-                # 既存リポジトリの場合、リモートを手動で追加
-                logger.info("Repository already exists, adding remote...")
-                
-                # 既存のリモートを削除（存在する場合）
-                await self.bot.project_manager.execute_git_command(dev_path, ["git", "remote", "remove", "origin"])
-                
-                # 新しいリモートを追加（HTTPS）
-                add_remote_cmd = ["git", "remote", "add", "origin", https_url]
-                success, output = await self.bot.project_manager.execute_git_command(dev_path, add_remote_cmd)
-                
-                if not success:
-                    logger.error(f"Failed to add remote: {output}")
-                    await loading_msg.edit(content=f"❌ リモート追加エラー:\n```\n{output}\n```")
-                    return None, None
-            else:
+            if not success and "already exists" not in output.lower():
                 await loading_msg.edit(
                     content=f"❌ GitHubリポジトリ作成エラー:\n```\n{output}\n```\n`gh auth login`で認証を確認してください"
                 )
                 return None, None
             
-            # GitHub Secretsの設定
-            await loading_msg.edit(content="`...` GitHub Secretsを設定中...")
-            secrets_success = await self._setup_github_secrets(thread_name, dev_path)
-            if not secrets_success:
-                logger.warning("Failed to set GitHub secrets, but continuing with repository setup")
+            https_url = f"https://github.com/{github_user}/{thread_name}.git"
             
-            # 現在のブランチ名を取得
-            success, branch_name = await self.bot.project_manager.execute_git_command(
-                dev_path, ["git", "branch", "--show-current"]
+            # GitHub SecretsはリモートのリポジトリをGitHub側で指定して設定するため、
+            # ローカルのリモートURL設定と並行して実行
+            loading_msg.set("`...` GitHub Secretsを設定中...")
+            remote_ok, secrets_success = await _gather_or_cancel(
+                self._set_development_remote(dev_path, https_url, success, loading_msg),
+                self._setup_github_secrets(thread_name, dev_path, github_user)
             )
+            if not remote_ok:
+                return None, None
+            if not secrets_success:
+                logger.warning("Failed to set GitHub secrets, but continuing with repository setup")
             
-            if not success or not branch_name.strip():
-                # ブランチが取得できない場合はデフォルトブランチを作成
-                await self.bot.project_manager.execute_git_command(
-                    dev_path, ["git", "checkout", "-b", "main"]
-                )
-                branch_name = "main"
-            else:
-                branch_name = branch_name.strip()
-            
-            # 初期コミットとプッシュ
-            dev_git_commands = [
-                ["git", "add", "."],
-                ["git", "commit", "-m", "Initial commit"],
-                ["git", "push", "-u", "origin", branch_name]
-            ]
-            
-            commit_skipped = False
-            for cmd in dev_git_commands:
-                # コミットがスキップされた場合、pushもスキップ
-                if commit_skipped and cmd[1] == "push":
-                    logger.info("Skipping push since there was nothing to commit")
-                    continue
-                
-                success, output = await self.bot.project_manager.execute_git_command(dev_path, cmd)
+            # 初期コミットのプッシュ（コミットが無ければスキップ）
+            if committed:
+                # pushの失敗は続行する（直後に完了メッセージで上書きされるため、Discordへの表示はせずログのみ）
+                # init_git_repositoryで初期ブランチはmainになっている（古いgitの場合も現在のブランチをmainとしてpush）
+                push_cmd = ["git", "push", "-u", "origin", f"HEAD:{DEFAULT_BRANCH}"]
+                success, output = await execute_git(dev_path, push_cmd, timeout=_PUSH_TIMEOUT)
                 if not success:
-                    # commitエラーで「nothing to commit」の場合は続行
-                    if cmd[1] == "commit" and "nothing to commit" in output.lower():
-                        logger.info("Nothing to commit in development directory, continuing...")
-                        await loading_msg.edit(content="`...` コミットする変更がありません。")
-                        commit_skipped = True
-                        continue
-                    # pushエラーでリモートの問題の場合
-                    elif cmd[1] == "push" and any(err in output for err in [
-                        "Could not read from remote repository",
-                        "fatal: 'origin' does not appear",
-                        "Permission denied",
-                        "fatal: unable to access"
-                    ]):
-                        logger.warning(f"Push failed due to remote issues: {output}")
-                        await loading_msg.edit(
-                            content=f"`...` リモートリポジトリへのプッシュをスキップします。\n"
-                            f"（リポジトリは作成済み: {https_url}）"
-                        )
-                        continue
+                    if any(err in output for err in _PUSH_REMOTE_ERRORS):
+                        logger.warning(f"Push failed due to remote issues, skipping push (repository: {https_url}): {output}")
                     else:
-                        # その他のエラー
-                        error_detail = output if output else f"Command failed: {' '.join(cmd)}"
-                        await loading_msg.edit(content=f"❌ Gitエラー:\n```\n{error_detail}\n```")
-                        # pushエラーの場合は続行、それ以外は失敗
-                        if cmd[1] != "push":
-                            return None, None
+                        logger.warning(f"Git push failed: {output}")
             
             github_url = f"https://github.com/{github_user}/{thread_name}"
+            completed = True
             return dev_path, github_url
         
         except Exception as e:
-            logger.error(f"Error in _setup_development_environment: {e}", exc_info=True)
+            logger.error("_setup_development_environment failed: %r", e)
+            logger.debug("_setup_development_environment traceback", exc_info=True)
             await loading_msg.edit(content=f"❌ 開発環境セットアップエラー: {str(e)[:100]}")
             return None, None
+        
+        finally:
+            if dev_path is not None and not completed:
+                logger.info(f"Removing incomplete development directory: {dev_path}")
+                await _run_in_thread(shutil.rmtree, dev_path, True)
+    
+    async def _set_development_remote(self, dev_path: Path, https_url: str, created: bool,
+                                      loading_msg: _ProgressMessage) -> bool:
+        """
+        開発ディレクトリのoriginをHTTPSのURLに設定
+        
+        Args:
+            dev_path: 開発ディレクトリのパス
+            https_url: リモートリポジトリのHTTPS URL
+            created: gh repo createでリポジトリ（とorigin）を作成できたか
+            loading_msg: 進捗表示用メッセージ
+        
+        Returns:
+            bool: 処理を続行できるか
+        """
+        set_url_cmd = ["git", "remote", "set-url", "origin", https_url]
+        
+        if created:
+            # リモートURLをHTTPSに設定
+            success, output = await self._execute_git(dev_path, set_url_cmd)
+            self._invalidate_remote_cache(dev_path)
+            
+            if success:
+                logger.info(f"Remote URL set to HTTPS: {https_url}")
+            else:
+                logger.warning(f"Failed to set HTTPS URL, keeping SSH: {output}")
+            return True
+        
+        # 既存リポジトリの場合、リモートを手動で追加
+        logger.info("Repository already exists, adding remote...")
+        
+        # 既存のリモートがあればURLをHTTPSに変更し、無ければ追加する
+        success, output = await self._execute_git(dev_path, set_url_cmd)
+        if not success:
+            add_remote_cmd = ["git", "remote", "add", "origin", https_url]
+            success, output = await self._execute_git(dev_path, add_remote_cmd)
+        self._invalidate_remote_cache(dev_path)
+        
+        if not success:
+            logger.error(f"Failed to add remote: {output}")
+            await loading_msg.edit(content=f"❌ リモート追加エラー:\n```\n{output}\n```")
+            return False
+        return True
+    
+    async def _commit_development_files(self, dev_path: Path,
+                                        loading_msg: _ProgressMessage) -> Tuple[bool, bool]:
+        """
+        Serena MCPの設定を追加し、開発ディレクトリの初期コミットを作成
+        
+        Args:
+            dev_path: 開発ディレクトリのパス
+            loading_msg: 進捗表示用メッセージ
+        
+        Returns:
+            Tuple[bool, bool]: (成功したか, コミットを作成したか)
+        """
+        execute_git = self._execute_git
+        
+        # Serena MCPをプロジェクトに追加（設定ファイルを初期コミットに含めるため、ステージより前に行う）
+        serena_cmd = [
+            "claude", "mcp", "add", "serena",
+            "--scope", "project",
+            "--", "uvx", "--from", "git+https://github.com/oraios/serena",
+            "serena", "start-mcp-server",
+            "--context", "ide-assistant",
+            "--project", str(dev_path)
+        ]
+        success, output = await async_run(serena_cmd, cwd=str(dev_path))
+        if success:
+            logger.info(f"Serena MCP configured for project: {dev_path}")
+        else:
+            logger.warning(f"Failed to configure Serena MCP: {output}")
+        
+        add_cmd = ["git", "add", "."]
+        success, output = await execute_git(dev_path, add_cmd)
+        if not success:
+            await self._report_git_error(loading_msg, add_cmd, output)
+            return False, False
+        
+        # ステージされた変更が無ければコミット・プッシュともスキップ
+        no_changes, _ = await execute_git(dev_path, ["git", "diff", "--cached", "--quiet"])
+        if no_changes:
+            logger.info("Nothing to commit in development directory, skipping commit and push")
+            return True, False
+        
+        commit_cmd = ["git", "commit", "-m", "Initial commit"]
+        success, output = await execute_git(dev_path, commit_cmd)
+        if not success:
+            await self._report_git_error(loading_msg, commit_cmd, output)
+            return False, False
+        return True, True
     
     async def _setup_next_stage_session(self, thread: discord.Thread, idea_name: str, 
                                       stage: str, project_path: Path) -> None:
@@ -724,8 +1027,6 @@ class CommandManager:
             stage: ステージ名
             project_path: プロジェクトパス
         """
-        from src.session_manager import get_session_manager
-        
         # セッション番号の割り当て
         thread_id = str(thread.id)
         session_manager = get_session_manager()
@@ -739,28 +1040,30 @@ class CommandManager:
         
         # ワークフロー状態の更新
         session_manager.update_project_stage(idea_name, stage)
-        session_manager.add_thread_to_workflow(idea_name, f"{stage[0]}-{stage}", thread_id)
+        session_manager.add_thread_to_workflow(idea_name, STAGE_TO_CHANNEL[stage], thread_id)
         
-        # ドキュメントファイルの作成
+        # ドキュメントファイルの作成（既存ファイルのmtimeを更新しないよう、無い場合のみイベントループ外で作成）
+        # project_pathは_run_phaseで存在確認済みのため、親ディレクトリの作成は不要
         doc_file = project_path / f"{stage}.md"
-        doc_file.touch()
+        await _run_in_thread(_touch_if_missing, doc_file)
         session_manager.add_project_document(idea_name, stage, doc_file)
         
-        # Claude Codeセッションの開始
-        await self.bot._start_claude_session(session_num, thread.name, working_dir)
+        # Claude Codeセッションの開始とFlask APIへの登録は互いに依存しないため並行して実行する
+        # 起動完了の確認はセッション開始と同時に始め（最大8秒）、待つ間にプロンプト生成も済ませておく
+        startup_wait = asyncio.create_task(self._wait_for_claude_ready(session_num, 8))
+        start_task = asyncio.create_task(
+            self.bot._start_claude_session(session_num, thread.name, working_dir)
+        )
         
         # Flask APIにセッション情報を登録
-        await self.bot._register_session_to_flask(
+        register_task = asyncio.create_task(self.bot._register_session_to_flask(
             session_num=session_num,
             thread_id=thread_id,
             idea_name=idea_name,
             current_stage=stage,
             working_directory=working_dir,
             project_path=str(project_path)
-        )
-        
-        # Claude Codeの起動完了を待ってからプロンプトを送信
-        await asyncio.sleep(8)  # 3秒から8秒に延長
+        ))
         
         # スレッド情報を準備
         thread_info = {
@@ -770,22 +1073,36 @@ class CommandManager:
         }
         
         # ステージに応じたプロンプトを生成（thread_infoとsession_numを渡す）
-        if stage == "requirements":
-            prompt = self.bot.context_manager.generate_requirements_prompt(
-                idea_name, thread_info=thread_info, session_num=session_num
-            )
-        elif stage == "design":
-            prompt = self.bot.context_manager.generate_design_prompt(
-                idea_name, thread_info=thread_info, session_num=session_num
-            )
-        elif stage == "tasks":
-            prompt = self.bot.context_manager.generate_tasks_prompt(
-                idea_name, thread_info=thread_info, session_num=session_num
+        # テンプレートの読み込みを含むため、イベントループ外で起動待ちと並行して実行する
+        tasks = [start_task, startup_wait, register_task]
+        generate_prompt = self._prompt_generators.get(stage)
+        if generate_prompt is not None:
+            tasks.append(asyncio.ensure_future(_run_in_thread(functools.partial(
+                generate_prompt, idea_name, thread_info=thread_info, session_num=session_num
+            ))))
+        
+        # 以降で失敗した場合は、起動済みのタスクを放置せずキャンセルする
+        try:
+            # Online Explorerリンクを生成
+            explorer_link = self._generate_online_explorer_link(str(project_path))
+            
+            # 起動待ちの間にスレッドへ初期メッセージを投稿（Online Explorerリンクを含む）し、
+            # セッション開始・起動待ち・Flask登録・プロンプト生成の完了を待ってからプロンプトを送信
+            results = await _gather_or_cancel(
+                thread.send(
+                    f"📝 Claude Code セッション #{session_num} を開始しました。\n"
+                    f"📄 ファイル: `{doc_file}`\n"
+                    f"🌐 ブラウザで確認: [Online Explorerで開く]({explorer_link})\n\n"
+                    f"{stage}ドキュメントを作成中..."
+                ),
+                *tasks
             )
-        else:
-            prompt = ""
+        except BaseException:
+            await _cancel_tasks(tasks)
+            raise
         
         # Flask経由でプロンプトを送信（プロンプトには既にコンテキストが含まれている）
+        prompt = results[-1] if generate_prompt is not None else ""
         if prompt:
             success, msg = await self.prompt_sender.send_prompt(
                 session_num=session_num,
@@ -795,17 +1112,28 @@ class CommandManager:
             
             if not success:
                 logger.error(f"Failed to send prompt for {stage}: {msg}")
+    
+    async def _wait_for_claude_ready(self, session_num: int, timeout: float) -> bool:
+        """
+        Claude Codeが入力を受け付ける状態になるまで待機（tmuxの画面に入力欄が表示されたかを確認する）
         
-        # Online Explorerリンクを生成
-        explorer_link = self._generate_online_explorer_link(str(project_path))
+        Args:
+            session_num: セッション番号
+            timeout: 最大待機秒数（入力欄を確認できない場合はこの秒数だけ待つ）
         
-        # スレッドに初期メッセージを投稿（Online Explorerリンクを含む）
-        await thread.send(
-            f"📝 Claude Code セッション #{session_num} を開始しました。\n"
-            f"📄 ファイル: `{doc_file}`\n"
-            f"🌐 ブラウザで確認: [Online Explorerで開く]({explorer_link})\n\n"
-            f"{stage}ドキュメントを作成中..."
-        )
+        Returns:
+            bool: 入力欄を確認できた場合True
+        """
+        cmd = ["tmux", "capture-pane", "-p", "-t", f"claude-session-{session_num}"]
+        for _ in range(max(1, round(timeout / _CLAUDE_READY_POLL_INTERVAL))):
+            # セッション作成前はcapture-paneが失敗するため、そのまま次の確認まで待つ
+            success, output = await async_run(cmd, verbose=False)
+            if success and _CLAUDE_READY_MARKER in output:
+                return True
+            await asyncio.sleep(_CLAUDE_READY_POLL_INTERVAL)
+        
+        logger.warning(f"Claude Code session {session_num} did not show its prompt within {timeout}s")
+        return False
     
     async def _setup_development_session(self, thread: discord.Thread, idea_name: str,
                                        working_dir: str, github_url: str) -> None:
@@ -818,8 +1146,6 @@ class CommandManager:
             working_dir: 作業ディレクトリ（開発ディレクトリ）
             github_url: GitHubリポジトリURL
         """
-        from src.session_manager import get_session_manager
-        
         # セッション番号の割り当て
         thread_id = str(thread.id)
         session_manager = get_session_manager()
@@ -839,52 +1165,78 @@ class CommandManager:
         
         # ワークフロー状態の更新
         session_manager.update_project_stage(idea_name, "development")
-        session_manager.add_thread_to_workflow(idea_name, "5-development", thread_id)
+        session_manager.add_thread_to_workflow(idea_name, STAGE_TO_CHANNEL["development"], thread_id)
         
         # Claude Codeセッションの開始（.mcp.jsonがあれば自動的に使用）
         session_name = f"claude-session-{session_num}"
         
-        # .mcp.jsonが存在する場合は--mcp-configオプションを追加
+        # .mcp.jsonが存在する場合は--mcp-configオプションを追加（存在確認はイベントループ外で1回だけ行う）
         mcp_json_path = Path(working_dir) / ".mcp.json"
-        mcp_option = f"--mcp-config {mcp_json_path}" if mcp_json_path.exists() else ""
+        has_mcp_config = await _run_in_thread(mcp_json_path.exists)
+        mcp_option = f"--mcp-config {mcp_json_path}" if has_mcp_config else ""
         claude_options = self.settings.get_claude_options()
         
-        if mcp_json_path.exists():
+        if has_mcp_config:
             logger.info(f"Using MCP configuration: {mcp_json_path}")
         
         claude_cmd = f"export LANG=C.UTF-8 && export LC_ALL=C.UTF-8 && cd {working_dir} && claude {mcp_option} {claude_options}".strip()
         cmd = ['tmux', 'new-session', '-d', '-s', session_name, 'bash', '-c', claude_cmd]
         
-        try:
-            subprocess.run(cmd, check=True)
-            logger.info(f"Started development session {session_num} in {working_dir}")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to start development session: {e}")
+        # Claude Codeの起動を確認してから開発プロンプトを送信（確認はtmux起動前から始め（最大3秒）、
+        # 待つ間にFlask APIへの登録とプロンプト生成を済ませておく）
+        startup_wait = asyncio.create_task(self._wait_for_claude_ready(session_num, 3))
         
-        # Flask APIにセッション情報を登録
-        await self.bot._register_session_to_flask(
+        # Flask APIにセッション情報を登録（tmuxの起動とは独立）
+        register_task = asyncio.create_task(self.bot._register_session_to_flask(
             session_num=session_num,
             thread_id=thread_id,
             idea_name=idea_name,
             current_stage="development",
             working_directory=working_dir,
             project_path=working_dir
-        )
-        
-        # 少し待ってから開発プロンプトを送信
-        await asyncio.sleep(3)
-        
-        # スレッド情報を準備
-        thread_info = {
-            'channel_name': thread.parent.name if thread.parent else 'Unknown',
-            'thread_name': thread.name,
-            'thread_id': thread_id
-        }
+        ))
         
-        # 開発プロンプトを生成（thread_infoとsession_numを渡す）
-        prompt = self.bot.context_manager.generate_development_prompt(
-            idea_name, thread_info=thread_info, session_num=session_num
-        )
+        # 以降で失敗した場合は、起動済みのタスクを放置せずキャンセルする
+        try:
+            # tmuxの起動中もイベントループを止めないよう非同期で実行
+            success, output = await async_run(cmd)
+            if success:
+                logger.info(f"Started development session {session_num} in {working_dir}")
+            else:
+                logger.error(f"Failed to start development session: {output}")
+            
+            # スレッド情報を準備
+            thread_info = {
+                'channel_name': thread.parent.name if thread.parent else 'Unknown',
+                'thread_name': thread.name,
+                'thread_id': thread_id
+            }
+            
+            # 開発プロンプトを生成（thread_infoとsession_numを渡す）
+            prompt = self.bot.context_manager.generate_development_prompt(
+                idea_name, thread_info=thread_info, session_num=session_num
+            )
+            
+            # Online Explorerリンクを生成
+            explorer_link = self._generate_online_explorer_link(working_dir)
+            
+            # 起動待ちの間にスレッドへ初期メッセージを投稿（Online Explorerリンクを含む）し、
+            # 起動待ちとFlask登録の完了を待ってからプロンプトを送信
+            await _gather_or_cancel(
+                startup_wait,
+                register_task,
+                thread.send(
+                    f"🚀 開発フェーズを開始しました！\n"
+                    f"📝 Claude Code セッション #{session_num}\n"
+                    f"📁 作業ディレクトリ: `{working_dir}`\n"
+                    f"🔗 GitHub: {github_url}\n"
+                    f"🌐 ブラウザエディタ: [Online Explorerで開く]({explorer_link})\n\n"
+                    f"tasks.mdに従って開発を進めてください。"
+                )
+            )
+        except BaseException:
+            await _cancel_tasks([startup_wait, register_task])
+            raise
         
         # Flask経由でプロンプトを送信（プロンプトには既にコンテキストが含まれている）
         success, msg = await self.prompt_sender.send_prompt(
@@ -895,48 +1247,47 @@ class CommandManager:
         
         if not success:
             logger.error(f"Failed to send development prompt: {msg}")
-        
-        # Online Explorerリンクを生成
-        explorer_link = self._generate_online_explorer_link(working_dir)
-        
-        # スレッドに初期メッセージを投稿（Online Explorerリンクを含む）
-        await thread.send(
-            f"🚀 開発フェーズを開始しました！\n"
-            f"📝 Claude Code セッション #{session_num}\n"
-            f"📁 作業ディレクトリ: `{working_dir}`\n"
-            f"🔗 GitHub: {github_url}\n"
-            f"🌐 ブラウザエディタ: [Online Explorerで開く]({explorer_link})\n\n"
-            f"tasks.mdに従って開発を進めてください。"
-        )
     
     async def _get_github_user(self) -> str:
-        """GitHub ユーザー名を取得"""
-        success, output = await async_run(["gh", "api", "user", "--jq", ".login"])
-        if success:
-            return output.strip()
-        return "unknown"
+        """GitHub ユーザー名を取得（取得できたユーザー名はプロセス内でキャッシュする）"""
+        if self._github_user is not None:
+            return self._github_user
+        
+        if self._github_user_lock is None:
+            self._github_user_lock = asyncio.Lock()
+        async with self._github_user_lock:
+            # ロック待ちの間に他のタスクが取得済みの場合はそれを使う
+            if self._github_user is None:
+                success, output = await self._run_git_tool(["gh", "api", "user", "--jq", ".login"])
+                if not success:
+                    # 認証されていない可能性があるため失敗はキャッシュしない
+                    return "unknown"
+                self._github_user = output.strip()
+        
+        return self._github_user
 
-    async def _setup_github_secrets(self, repo_name: str, dev_path: Path) -> bool:
+    async def _setup_github_secrets(self, repo_name: str, dev_path: Path, github_user: str) -> bool:
         """
         GitHub SecretsにClaude Code OAuthトークンを設定
         
         Args:
             repo_name: リポジトリ名
             dev_path: 開発ディレクトリパス
+            github_user: リポジトリを所有するGitHubユーザー名
             
         Returns:
             bool: 成功した場合True、失敗した場合False
         """
         try:
             # 1. credentials.jsonからOAuthトークンを取得
+            # ファイルの読み込みとJSONの解析はイベントループ外で行う
             credentials_path = Path.home() / ".claude" / ".credentials.json"
-            if not credentials_path.exists():
+            try:
+                credentials = await _run_in_thread(_load_json, credentials_path)
+            except FileNotFoundError:
                 logger.warning("Claude credentials file not found. Please login with 'claude login'")
                 return False
             
-            with open(credentials_path, 'r') as f:
-                credentials = json.load(f)
-            
             oauth_data = credentials.get('claudeAiOauth', {})
             access_token = oauth_data.get('accessToken')
             expires_at = oauth_data.get('expiresAt', 0)
@@ -954,11 +1305,10 @@ class CommandManager:
                 logger.info(f"OAuth token valid until {expiry_date}")
             
             # 3. gh secretコマンドで設定
-            github_user = await self._get_github_user()
             cmd = ["gh", "secret", "set", "CLAUDE_CODE_OAUTH_TOKEN", 
                    "-b", access_token, "-R", f"{github_user}/{repo_name}"]
             
-            success, output = await async_run(cmd, cwd=str(dev_path))
+            success, output = await self._run_git_tool(cmd, cwd=str(dev_path))
             
             if success:
                 logger.info(f"GitHub Secret CLAUDE_CODE_OAUTH_TOKEN set for {repo_name}")
@@ -972,35 +1322,50 @@ class CommandManager:
             return False
     
     async def _check_git_remote(self, repo_path: Path) -> bool:
-        """Gitリモートが設定されているか確認"""
-        success, output = await self.bot.project_manager.execute_git_command(
-            repo_path, ["git", "remote", "get-url", "origin"]
-        )
-        return success
+        """Gitリモートが設定されているか確認（結果はリポジトリごとにキャッシュする）"""
+        key = str(repo_path)
+        has_remote = self._remote_cache.get(key)
+        if has_remote is None:
+            # .git/configにoriginが無ければgitを起動せずに未設定と判定する
+            if await _run_in_thread(_origin_absent_in_config, repo_path):
+                has_remote = False
+            else:
+                has_remote, _ = await self._execute_git(
+                    repo_path, ["git", "remote", "get-url", "origin"]
+                )
+            self._remote_cache[key] = has_remote
+        return has_remote
+    
+    def _invalidate_remote_cache(self, repo_path: Path) -> None:
+        """リモート設定を変更したリポジトリのキャッシュを破棄"""
+        self._remote_cache.pop(str(repo_path), None)
     
-    async def _setup_projects_remote(self, projects_root: Path, loading_msg) -> bool:
+    async def _setup_projects_remote(self, projects_root: Path, loading_msg: _ProgressMessage) -> bool:
         """projectsディレクトリのリモートリポジトリを設定"""
+        execute_git = self._execute_git
+        
         try:
-            # GitHub CLIを使ってprojectsリポジトリを作成
-            github_user = await self._get_github_user()
-            if github_user == "unknown":
-                logger.warning("Could not get GitHub user, skipping remote setup")
-                return False
-            
-            # リポジトリを作成（パブリック）
+            # GitHub CLIを使ってprojectsリポジトリを作成（パブリック）
+            # ユーザー名の取得・リポジトリ作成・初期コミット（ローカル処理）はpushまで互いに依存しないため並行して実行する
+            # （ユーザー名が取得できない未認証の状態ではリポジトリ作成も失敗する）
             create_cmd = ["gh", "repo", "create", "achi-kun-projects", 
                          "--public", "--source", ".", "--remote", "origin",
                          "--description", "Achi-kun Discord bot project documentation repository"]
-            success, output = await async_run(create_cmd, cwd=str(projects_root))
+            github_user, (success, output), _ = await _gather_or_cancel(
+                self._get_github_user(),
+                self._run_git_tool(create_cmd, cwd=str(projects_root)),
+                self._commit_projects_files(projects_root)
+            )
+            if github_user == "unknown":
+                logger.warning("Could not get GitHub user, skipping remote setup")
+                return False
             
             if not success:
                 if "already exists" in output.lower():
                     # リポジトリが既存の場合、リモートを追加
                     remote_url = f"https://github.com/{github_user}/achi-kun-projects.git"
                     add_remote_cmd = ["git", "remote", "add", "origin", remote_url]
-                    success, output = await self.bot.project_manager.execute_git_command(
-                        projects_root, add_remote_cmd
-                    )
+                    success, output = await execute_git(projects_root, add_remote_cmd)
                     if not success and "already exists" not in output.lower():
                         logger.error(f"Failed to add remote: {output}")
                         return False
@@ -1008,30 +1373,33 @@ class CommandManager:
                     logger.error(f"Failed to create projects repository: {output}")
                     return False
             
-            # 初期コミット
-            await self.bot.project_manager.execute_git_command(
-                projects_root, ["git", "add", "."]
-            )
-            await self.bot.project_manager.execute_git_command(
-                projects_root, ["git", "commit", "-m", "Initial commit"]
-            )
-            
-            # mainブランチを作成してプッシュ
-            await self.bot.project_manager.execute_git_command(
-                projects_root, ["git", "branch", "-M", "main"]
-            )
-            success, output = await self.bot.project_manager.execute_git_command(
-                projects_root, ["git", "push", "-u", "origin", "main"]
+            # init_git_repositoryで初期ブランチはmainになっているため、ブランチ名の変更はせずにプッシュ
+            # （古いgitの場合も現在のブランチをmainとしてpush）
+            success, output = await execute_git(
+                projects_root, ["git", "push", "-u", "origin", f"HEAD:{DEFAULT_BRANCH}"], timeout=_PUSH_TIMEOUT
             )
             
             if success:
-                await loading_msg.edit(content="`...` プロジェクトリポジトリを作成しました: https://github.com/{}/achi-kun-projects".format(github_user))
+                logger.info(f"Created projects repository: https://github.com/{github_user}/achi-kun-projects")
             
             return success
             
         except Exception as e:
             logger.error(f"Error setting up projects remote: {e}")
             return False
+        finally:
+            # gh repo create / git remote addでリモートが変わっている可能性がある
+            self._invalidate_remote_cache(projects_root)
+    
+    async def _commit_projects_files(self, projects_root: Path) -> None:
+        """
+        projectsリポジトリの初期コミットを作成（コミットする変更が無い場合の失敗は無視する）
+        
+        Args:
+            projects_root: プロジェクトのルートディレクトリ
+        """
+        await self._execute_git(projects_root, ["git", "add", "."])
+        await self._execute_git(projects_root, ["git", "commit", "-m", "Initial commit"])
     
     async def _terminate_current_session(self, ctx) -> None:
         """
@@ -1042,7 +1410,6 @@ class CommandManager:
         """
         try:
             from src.tmux_manager import TmuxManager
-            from src.session_manager import get_session_manager
             
             tmux_manager = TmuxManager()
             session_manager = get_session_manager()
@@ -21,7 +21,6 @@ import os
 import sys
 import json
 import asyncio
-import subprocess
 import logging
 from dotenv import load_dotenv
 
@@ -53,6 +52,7 @@ from src.claude_context_manager import ClaudeContextManager
 from src.channel_validator import ChannelValidator
 from src.command_manager import CommandManager
 from src.prompt_sender import get_prompt_sender
+from lib.command_executor import async_run
 
 # ログ設定（本番環境では外部設定ファイルから読み込み可能）
 logging.basicConfig(
@@ -146,6 +146,11 @@ class ClaudeCLIBot(commands.Bot):
         
         super().__init__(command_prefix='!', intents=intents)
         
+    async def close(self):
+        """Bot終了時にFlask API用のHTTPセッションも閉じる"""
+        await self.prompt_sender.close()
+        await super().close()
+        
     async def on_ready(self):
         """
         Bot準備完了時の初期化処理
@@ -180,6 +185,18 @@ class ClaudeCLIBot(commands.Bot):
         # 定期メンテナンス処理の開始
         await self._start_maintenance_tasks()
         
+    async def on_guild_channel_create(self, channel):
+        """チャンネル作成時にチャンネル検索キャッシュを破棄"""
+        self.channel_validator.invalidate(channel.guild.id)
+    
+    async def on_guild_channel_delete(self, channel):
+        """チャンネル削除時にチャンネル検索キャッシュを破棄"""
+        self.channel_validator.invalidate(channel.guild.id)
+    
+    async def on_guild_channel_update(self, before, after):
+        """チャンネル更新（名前変更等）時にチャンネル検索キャッシュを破棄"""
+        self.channel_validator.invalidate(after.guild.id)
+        
     async def _perform_initial_cleanup(self):
         """
         Bot起動時の初回クリーンアップ処理
@@ -461,12 +478,13 @@ class ClaudeCLIBot(commands.Bot):
         claude_cmd = f"export LANG=C.UTF-8 && export LC_ALL=C.UTF-8 && cd {work_dir} && claude {claude_options}".strip()
         cmd = ['tmux', 'new-session', '-d', '-s', session_name, 'bash', '-c', claude_cmd]
         
-        try:
-            subprocess.run(cmd, check=True)
+        # tmuxの起動中もイベントループを止めないよう非同期で実行
+        success, output = await async_run(cmd)
+        if success:
             logger.info(f"Started Claude Code session {session_num} for thread: {thread_name}")
             print(f"🚀 Started Claude Code session {session_num}")
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to start Claude Code session: {e}")
+        else:
+            logger.error(f"Failed to start Claude Code session: {output}")
             print(f"❌ Failed to start Claude Code session {session_num}")
     
     async def _register_session_to_flask(self, session_num: int, thread_id: str, 
@@ -491,13 +509,14 @@ class ClaudeCLIBot(commands.Bot):
             payload['create_project'] = True
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=5)) as response:
-                    if response.status == 200:
-                        logger.info(f"Successfully registered session {session_num} to Flask API")
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Failed to register session to Flask API: {response.status} - {error_text}")
+            # プロンプト送信と同じセッションを使い、Flask APIへの接続を使い回す
+            session = self.prompt_sender.get_session()
+            async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status == 200:
+                    logger.info(f"Successfully registered session {session_num} to Flask API")
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Failed to register session to Flask API: {response.status} - {error_text}")
         except aiohttp.ClientError as e:
             logger.error(f"Failed to connect to Flask API: {e}")
         except Exception as e:
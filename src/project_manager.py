@@ -19,6 +19,9 @@ from lib.command_executor import execute_git_command as exec_git_cmd, async_run
 
 logger = logging.getLogger(__name__)
 
+# init_git_repositoryで作成するリポジトリの初期ブランチ名
+DEFAULT_BRANCH = "main"
+
 
 class ProjectManager:
     """プロジェクトディレクトリとファイルを管理するクラス"""
@@ -187,7 +190,7 @@ class ProjectManager:
     
     async def init_git_repository(self, path: Path) -> Tuple[bool, str]:
         """
-        Gitリポジトリを初期化
+        Gitリポジトリを初期化（初期ブランチはDEFAULT_BRANCH）
         
         Args:
             path: リポジトリのパス
@@ -196,8 +199,11 @@ class ProjectManager:
             (成功フラグ, 出力メッセージ)
         """
         try:
-            # git initコマンドを実行
-            result = await async_run(["git", "init"], cwd=str(path))
+            # git initコマンドを実行（初期ブランチはmainにする）
+            # init.defaultBranchを解釈しない古いgitでも失敗しないよう、-bではなく設定で指定する
+            result = await async_run(
+                ["git", "-c", f"init.defaultBranch={DEFAULT_BRANCH}", "init"], cwd=str(path)
+            )
             
             if result[0]:
                 logger.info(f"Initialized git repository: {path}")
@@ -211,13 +217,15 @@ class ProjectManager:
             logger.error(error_msg)
             return False, error_msg
     
-    async def execute_git_command(self, path: Path, command: List[str]) -> Tuple[bool, str]:
+    async def execute_git_command(self, path: Path, command: List[str],
+                                  timeout: Optional[float] = None) -> Tuple[bool, str]:
         """
         任意のGitコマンドを実行
         
         Args:
             path: 実行ディレクトリ
             command: Gitコマンドのリスト（例: ["git", "add", "."]）
+            timeout: タイムアウト秒数（None で無制限）
             
         Returns:
             (成功フラグ, 出力メッセージ)
@@ -228,7 +236,7 @@ class ProjectManager:
         else:
             git_args = command
         
-        return await exec_git_cmd(path, git_args, verbose=True)
+        return await exec_git_cmd(path, git_args, verbose=True, timeout=timeout)
     
     def get_project_path(self, idea_name: str) -> Path:
         """プロジェクトディレクトリのパスを取得"""
@@ -9,7 +9,9 @@ Prompt Sender - Claude Codeへのプロンプト送信を統一管理
 4. エラーハンドリングとリトライ
 """
 
+import asyncio
 import logging
+import aiohttp
 import requests
 from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
@@ -33,6 +35,33 @@ class PromptSender:
         self.timeout = timeout
         self.base_url = f"http://localhost:{flask_port}"
         self.prompts_dir = Path(__file__).parent.parent / "prompts"
+        # Flask APIへの接続を使い回すセッション（イベントループ上で初回利用時に作成）
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Flask API用のHTTPセッションを取得（keep-aliveで接続を使い回す）
+        
+        閉じられている場合や別のイベントループから呼ばれた場合は作り直す。
+        
+        Returns:
+            aiohttp.ClientSession
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+            self._session_loop = loop
+        return self._session
+    
+    async def close(self) -> None:
+        """HTTPセッションを閉じる（Bot終了時に呼ぶ）"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
     
     async def send_prompt(self, 
                          session_num: int,
@@ -62,25 +91,26 @@ class PromptSender:
                 'username': str(username)
             }
             
-            response = requests.post(
+            # イベントループを止めず、Flask APIへの接続はセッションで使い回す
+            async with self.get_session().post(
                 f"{self.base_url}/discord-message",
-                json=payload,
-                timeout=self.timeout
-            )
+                json=payload
+            ) as response:
+                status = response.status
             
-            if response.status_code == 200:
+            if status == 200:
                 logger.info(f"Successfully sent prompt to session {session_num}")
                 return True, "✅ プロンプトを送信しました"
             else:
-                error_msg = f"Failed to send prompt: HTTP {response.status_code}"
+                error_msg = f"Failed to send prompt: HTTP {status}"
                 logger.error(error_msg)
                 return False, f"❌ エラー: {error_msg}"
                 
-        except requests.exceptions.ConnectionError:
+        except aiohttp.ClientConnectionError:
             error_msg = "Failed to connect to Flask API"
             logger.error(error_msg)
             return False, "❌ エラー: Flask APIに接続できません"
-        except requests.exceptions.Timeout:
+        except asyncio.TimeoutError:
             error_msg = f"Request timeout after {self.timeout} seconds"
             logger.error(error_msg)
             return False, "❌ エラー: リクエストがタイムアウトしました"
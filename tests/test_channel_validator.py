@@ -72,6 +72,22 @@ class TestChannelValidator:
         
         assert len(errors) == 0
     
+    @pytest.mark.asyncio
+    async def test_validate_all_channels_checks_each_channel_once(self, validator, mock_guild, mock_channels):
+        """重複チャンネルがあっても権限チェックは必須チャンネルごとに1回のみのテスト"""
+        duplicate = Mock()
+        duplicate.name = "old-1-idea"
+        duplicate.id = 999
+        duplicate.permissions_for = Mock()
+        mock_guild.text_channels = mock_channels + [duplicate]
+        
+        errors = await validator.validate_all_channels(mock_guild)
+        
+        assert errors == []
+        for channel in mock_channels:
+            channel.permissions_for.assert_called_once()
+        duplicate.permissions_for.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_validate_all_channels_missing(self, validator, mock_guild):
         """チャンネル不足テスト"""
@@ -117,6 +133,21 @@ class TestChannelValidator:
         
         assert len(errors) == 0
     
+    @pytest.mark.asyncio
+    async def test_validate_channel_permissions_with_bot_member(self, validator):
+        """渡されたボットメンバーで権限を判定するテスト"""
+        channel = Mock()
+        bot_member = Mock()
+        permissions = Mock()
+        for perm in validator.REQUIRED_PERMISSIONS:
+            setattr(permissions, perm, True)
+        channel.permissions_for = Mock(return_value=permissions)
+        
+        errors = await validator.validate_channel_permissions(channel, bot_member)
+        
+        assert errors == []
+        channel.permissions_for.assert_called_once_with(bot_member)
+    
     @pytest.mark.asyncio
     async def test_validate_channel_permissions_missing(self, validator):
         """権限不足テスト"""
@@ -144,6 +175,26 @@ class TestChannelValidator:
         assert "send_messages_in_threads" in errors[0]
         assert "attach_files" in errors[0]
     
+    @pytest.mark.asyncio
+    async def test_validate_channel_permissions_real_permissions(self, validator):
+        """discord.Permissionsを使った権限検証テスト"""
+        import discord
+        
+        channel = Mock()
+        channel.name = "test-channel"
+        channel.guild.me = Mock()
+        
+        channel.permissions_for = Mock(return_value=discord.Permissions(
+            **{perm: True for perm in validator.REQUIRED_PERMISSIONS}
+        ))
+        assert await validator.validate_channel_permissions(channel) == []
+        
+        channel.permissions_for = Mock(return_value=discord.Permissions(
+            **{perm: perm != "embed_links" for perm in validator.REQUIRED_PERMISSIONS}
+        ))
+        errors = await validator.validate_channel_permissions(channel)
+        assert errors == ["Missing permissions: embed_links"]
+    
     def test_get_channel_by_name_found(self, validator, mock_guild, mock_channels):
         """チャンネル名検索成功テスト"""
         mock_guild.text_channels = mock_channels
@@ -161,6 +212,20 @@ class TestChannelValidator:
         
         assert channel is None
     
+    def test_get_channel_by_name_uses_cache(self, validator, mock_guild, mock_channels):
+        """2回目以降の検索はキャッシュから返し、invalidate後は再走査するテスト"""
+        mock_guild.id = 1
+        mock_guild.text_channels = mock_channels
+        
+        first = validator.get_channel_by_name(mock_guild, "3-design")
+        
+        # チャンネル一覧を差し替えてもキャッシュが使われる
+        mock_guild.text_channels = []
+        assert validator.get_channel_by_name(mock_guild, "3-design") is first
+        
+        validator.invalidate(mock_guild.id)
+        assert validator.get_channel_by_name(mock_guild, "3-design") is None
+    
     def test_get_required_channel(self, validator, mock_guild, mock_channels):
         """ステージ別チャンネル取得テスト"""
         mock_guild.text_channels = mock_channels
@@ -199,6 +264,10 @@ class TestChannelValidator:
         assert len(result["channel_status"]) == 5
         assert all(status["found"] for status in result["channel_status"].values())
         assert "BotRole" in result["bot_roles"]
+        
+        # チャンネルの解決は検証時の1回の走査で済ませる
+        validator.get_channel_by_name = Mock(side_effect=AssertionError("rescanned"))
+        await validator.check_bot_setup(mock_guild)
     
     @pytest.mark.asyncio
     async def test_check_bot_setup_incomplete(self, validator, mock_guild):
@@ -10,7 +10,7 @@ import pytest
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.claude_context_manager import ClaudeContextManager
+from src.claude_context_manager import ClaudeContextManager, PromptTemplateLoader
 
 
 class TestClaudeContextManager:
@@ -175,10 +175,30 @@ class TestClaudeContextManager:
         assert context_manager.get_stage_from_channel("#1-idea") == "idea"
         assert context_manager.get_stage_from_channel("test-2-requirements") == "requirements"
         
+        # 番号は一致するがステージ名が異なるチャンネル
+        assert context_manager.get_stage_from_channel("1-random") is None
+        assert context_manager.get_stage_from_channel("3-design-review") == "design"
+        
         # 未知のチャンネル
         assert context_manager.get_stage_from_channel("general") is None
         assert context_manager.get_stage_from_channel("random-channel") is None
     
+    def test_default_prompts_without_templates(self, tmp_path):
+        """テンプレートファイルが無い場合のデフォルトプロンプトテスト"""
+        sdd_path = tmp_path / "{sdd}.md"
+        manager = ClaudeContextManager(sdd_path=sdd_path, prompts_dir=tmp_path / "missing")
+        
+        idea_prompt = manager.generate_idea_prompt("test-app", "parent {text}")
+        assert "./projects/test-app/idea.md" in idea_prompt
+        assert "parent {text}" in idea_prompt
+        
+        requirements_prompt = manager.generate_requirements_prompt("test-app")
+        assert f"{sdd_path}のRequirement Gathering" in requirements_prompt
+        assert "./projects/test-app/requirements.md" in requirements_prompt
+        
+        development_prompt = manager.generate_development_prompt("test-app")
+        assert "./development/test-app/" in development_prompt
+    
     def test_default_sdd_path(self):
         """デフォルトSDD.mdパステスト"""
         manager = ClaudeContextManager()
@@ -188,5 +208,88 @@ class TestClaudeContextManager:
         assert "docs" in str(manager.sdd_path)
 
 
+
+class TestPromptTemplateLoader:
+    """PromptTemplateLoaderのテストクラス"""
+    
+    @pytest.fixture
+    def loader(self, tmp_path):
+        """一時プロンプトディレクトリを使うローダー"""
+        PromptTemplateLoader.clear_cache()
+        yield PromptTemplateLoader(tmp_path)
+        PromptTemplateLoader.clear_cache()
+    
+    def test_load_template_cached_until_modified(self, loader, tmp_path, monkeypatch):
+        """mtimeが変わるまでファイルを再読込しないテスト"""
+        import os
+        
+        template = tmp_path / "cc.md"
+        template.write_text("first", encoding="utf-8")
+        assert loader.load_template("cc.md") == "first"
+        
+        with monkeypatch.context() as m:
+            m.setattr(Path, "read_text", lambda *a, **k: pytest.fail("re-read"))
+            assert loader.load_template("cc.md") == "first"
+        
+        template.write_text("second", encoding="utf-8")
+        stat = template.stat()
+        os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert loader.load_template("cc.md") == "second"
+    
+    def test_load_and_combine_templates_cached(self, loader, tmp_path):
+        """結合結果がキャッシュされ、ファイル更新で作り直されるテスト"""
+        import os
+        
+        (tmp_path / "context_base.md").write_text("base", encoding="utf-8")
+        command = tmp_path / "idea.md"
+        command.write_text("idea", encoding="utf-8")
+        
+        first = loader.load_and_combine_templates("idea.md")
+        assert first == "base\n\nidea"
+        assert loader.load_and_combine_templates("idea.md") is first
+        
+        command.write_text("idea v2", encoding="utf-8")
+        stat = command.stat()
+        os.utime(command, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert loader.load_and_combine_templates("idea.md") == "base\n\nidea v2"
+    
+    def test_missing_command_template_not_stat_again(self, loader, tmp_path, monkeypatch):
+        """存在しないコマンドテンプレートは2回目以降statしないテスト"""
+        (tmp_path / "context_base.md").write_text("base", encoding="utf-8")
+        assert loader.load_and_combine_templates("complete/tasks.md") == "base"
+        
+        stat = Path.stat
+        def guarded_stat(self, *args, **kwargs):
+            assert self.name != "tasks.md", "re-stat of missing template"
+            return stat(self, *args, **kwargs)
+        monkeypatch.setattr(Path, "stat", guarded_stat)
+        assert loader.load_and_combine_templates("complete/tasks.md") == "base"
+    
+    def test_preload_templates(self, loader, tmp_path, monkeypatch):
+        """起動時に読み込んだテンプレートは再読込しないテスト"""
+        (tmp_path / "context_base.md").write_text("base", encoding="utf-8")
+        (tmp_path / "idea.md").write_text("idea", encoding="utf-8")
+        loader.preload_templates(["context_base.md", "idea.md", "complete/tasks.md"])
+        
+        assert "complete/tasks.md" in loader._known_missing
+        monkeypatch.setattr(Path, "read_text", lambda *a, **k: pytest.fail("re-read"))
+        assert loader.load_and_combine_templates("idea.md") == "base\n\nidea"
+    
+    def test_render_template_matches_safe_substitute(self, loader):
+        """string.Template.safe_substituteと同じ結果になるテスト"""
+        from string import Template
+        
+        content = "${idea_name} $idea_name $$ {literal} ${missing} $missing $1 ${thread_name}"
+        variables = {"idea_name": "app", "thread_name": None}
+        expected = Template(content).safe_substitute({"idea_name": "app", "thread_name": ""})
+        
+        assert loader.render_template(content, variables) == expected
+        assert loader.render_template(content, variables) == expected
+    
+    def test_load_template_missing(self, loader):
+        """存在しないテンプレートのテスト"""
+        assert loader.load_template("missing.md") is None
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
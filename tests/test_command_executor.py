@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+command_executorのユニットテスト
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.command_executor import async_run, sync_run, execute_git_command, GitWorker
+
+
+PYTHON = sys.executable
+
+
+class TestCommandExecutor:
+    """command_executorのテストクラス"""
+    
+    @pytest.mark.asyncio
+    async def test_async_run_success(self):
+        """非同期実行成功テスト"""
+        success, output = await async_run([PYTHON, "-c", "print('hello')"])
+        
+        assert success
+        assert output == "hello"
+    
+    @pytest.mark.asyncio
+    async def test_async_run_failure_prefers_stderr(self):
+        """失敗時はstderrを優先して返すテスト"""
+        code = "import sys; print('out'); sys.stderr.write('err\\n'); sys.exit(1)"
+        success, output = await async_run([PYTHON, "-c", code])
+        
+        assert not success
+        assert output == "err"
+    
+    @pytest.mark.asyncio
+    async def test_async_run_failure_falls_back_to_stdout(self):
+        """stderrが空の場合はstdoutを返すテスト"""
+        code = "import sys; print('out'); sys.exit(1)"
+        success, output = await async_run([PYTHON, "-c", code])
+        
+        assert not success
+        assert output == "out"
+    
+    @pytest.mark.asyncio
+    async def test_async_run_failure_without_output(self):
+        """出力が無い失敗時は終了コードを返すテスト"""
+        success, output = await async_run([PYTHON, "-c", "import sys; sys.exit(3)"])
+        
+        assert not success
+        assert output == "Command failed with exit code 3"
+    
+    @pytest.mark.asyncio
+    async def test_async_run_does_not_wait_for_stdin(self):
+        """子プロセスが入力を待たずにEOFを受け取るテスト"""
+        code = "import sys; print(repr(sys.stdin.read()))"
+        success, output = await async_run([PYTHON, "-c", code], timeout=10)
+        
+        assert success
+        assert output == "''"
+    
+    @pytest.mark.asyncio
+    async def test_async_run_cancel_kills_process(self, tmp_path):
+        """キャンセルされた場合に子プロセスが終了されるテスト"""
+        pid_file = tmp_path / "pid"
+        code = f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); time.sleep(30)"
+        task = asyncio.create_task(async_run([PYTHON, "-c", code]))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.01)
+        
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        
+        pid = int(pid_file.read_text())
+        for _ in range(100):
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                break
+            await asyncio.sleep(0.01)
+        else:
+            pytest.fail("process was not killed")
+    
+    @pytest.mark.asyncio
+    async def test_async_run_cancel_kills_process_group(self, tmp_path):
+        """タイムアウト指定の実行がキャンセルされた場合に孫プロセスも終了されるテスト"""
+        pid_file = tmp_path / "pid"
+        code = (
+            "import subprocess, sys, time; "
+            f"child = subprocess.Popen([{PYTHON!r}, '-c', 'import time; time.sleep(30)']); "
+            f"open({str(pid_file)!r}, 'w').write(str(child.pid)); time.sleep(30)"
+        )
+        task = asyncio.create_task(async_run([PYTHON, "-c", code], timeout=60))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.01)
+        
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        
+        stat_file = Path(f"/proc/{pid_file.read_text()}/stat")
+        for _ in range(100):
+            # 親を失った孫プロセスはinitに回収されるまでゾンビとして残ることがある
+            try:
+                if stat_file.read_text().rsplit(")", 1)[1].split()[0] == "Z":
+                    break
+            except FileNotFoundError:
+                break
+            await asyncio.sleep(0.01)
+        else:
+            pytest.fail("grandchild process was not killed")
+    
+    def test_sync_run_success(self):
+        """同期実行成功テスト"""
+        success, output = sync_run([PYTHON, "-c", "print('hello')"])
+        
+        assert success
+        assert output == "hello"
+    
+    def test_sync_run_failure(self):
+        """同期実行失敗テスト"""
+        code = "import sys; sys.stderr.write('err\\n'); sys.exit(1)"
+        success, output = sync_run([PYTHON, "-c", code])
+        
+        assert not success
+        assert output == "err"
+        
+        success, output = sync_run([PYTHON, "-c", "import sys; sys.exit(2)"])
+        assert not success
+        assert output == "Command failed with exit code 2"
+    
+    def test_command_not_found(self):
+        """存在しないコマンドのテスト"""
+        success, output = sync_run(["definitely-not-a-command-xyz"])
+        
+        assert not success
+        assert "Command not found" in output
+    
+    @pytest.mark.asyncio
+    async def test_execute_git_command_missing_directory(self, tmp_path):
+        """存在しないディレクトリではgitのエラーが返るテスト"""
+        success, output = await execute_git_command(tmp_path / "missing", ["status"], verbose=False)
+        
+        assert not success
+        assert "Command not found" not in output
+        assert "missing" in output
+
+
+class TestGitWorker:
+    """GitWorkerのテストクラス"""
+    
+    @pytest.fixture
+    def repo_dir(self, tmp_path):
+        """コミット可能な一時Gitリポジトリ"""
+        sync_run(["git", "init"], cwd=tmp_path)
+        sync_run(["git", "config", "user.name", "Test"], cwd=tmp_path)
+        sync_run(["git", "config", "user.email", "test@example.com"], cwd=tmp_path)
+        return tmp_path
+    
+    @pytest.mark.asyncio
+    async def test_add_and_commit_in_process(self, repo_dir):
+        """pygit2によるadd/commitのテスト"""
+        pytest.importorskip("pygit2")
+        worker = GitWorker()
+        (repo_dir / "docs").mkdir()
+        (repo_dir / "docs" / "idea.md").write_text("idea")
+        
+        assert await worker.run_async(repo_dir, ["add", "docs/*"]) == (True, "Command completed successfully")
+        assert worker.run(repo_dir, ["status", "--porcelain"]) == (True, "A  docs/idea.md")
+        
+        success, output = await worker.run_async(repo_dir, ["commit", "-m", "Add idea"])
+        assert success
+        assert output.endswith("Add idea")
+        
+        success, log = sync_run(["git", "log", "--format=%s"], cwd=repo_dir)
+        assert log == "Add idea"
+        
+        success, output = worker.run(repo_dir, ["commit", "-m", "Again"])
+        assert not success
+        assert "nothing to commit" in output
+    
+    def test_diff_cached_quiet(self, repo_dir):
+        """ステージされた変更の有無をgitコマンドと同じ終了状態で返すテスト"""
+        pytest.importorskip("pygit2")
+        worker = GitWorker()
+        
+        assert worker.run(repo_dir, ["diff", "--cached", "--quiet"])[0]
+        (repo_dir / "a.txt").write_text("a")
+        worker.run(repo_dir, ["add", "a.txt"])
+        assert not worker.run(repo_dir, ["diff", "--cached", "--quiet"])[0]
+        assert sync_run(["git", "diff", "--cached", "--quiet"], cwd=repo_dir)[0] is False
+        
+        worker.run(repo_dir, ["commit", "-m", "Add a"])
+        assert worker.run(repo_dir, ["diff", "--cached", "--quiet"])[0]
+        assert worker.run(repo_dir, ["diff", "--cached"]) is None
+    
+    def test_remote_get_url(self, repo_dir):
+        """リモートURLの取得をgitコマンドと同じ結果で返すテスト"""
+        pytest.importorskip("pygit2")
+        worker = GitWorker()
+        
+        success, output = worker.run(repo_dir, ["remote", "get-url", "origin"])
+        assert not success
+        assert output == "error: No such remote 'origin'"
+        
+        # 外部のgitコマンドによる変更も反映される
+        sync_run(["git", "remote", "add", "origin", "https://github.com/testuser/test-app.git"], cwd=repo_dir)
+        assert worker.run(repo_dir, ["remote", "get-url", "origin"]) == sync_run(
+            ["git", "remote", "get-url", "origin"], cwd=repo_dir
+        )
+        assert worker.run(repo_dir, ["remote", "-v"]) is None
+    
+    def test_remote_set_url_and_add(self, repo_dir):
+        """リモートの追加・URL変更をgitコマンドと同じ結果で行うテスト"""
+        pytest.importorskip("pygit2")
+        worker = GitWorker()
+        url = "https://github.com/testuser/test-app.git"
+        
+        assert worker.run(repo_dir, ["remote", "set-url", "origin", url]) == (False, "error: No such remote 'origin'")
+        assert worker.run(repo_dir, ["remote", "add", "origin", "git@github.com:testuser/test-app.git"])[0]
+        assert worker.run(repo_dir, ["remote", "add", "origin", url]) == (False, "error: remote origin already exists.")
+        
+        assert worker.run(repo_dir, ["remote", "set-url", "origin", url])[0]
+        assert sync_run(["git", "remote", "get-url", "origin"], cwd=repo_dir) == (True, url)
+        assert worker.run(repo_dir, ["remote", "add", "-f", "upstream", url]) is None
+    
+    def test_unsupported_commands_fall_back(self, repo_dir):
+        """未対応のコマンド・引数ではNoneを返すテスト"""
+        worker = GitWorker()
+        
+        assert worker.run(repo_dir, ["push"]) is None
+        assert worker.run(repo_dir, ["commit", "--amend"]) is None
+        assert worker.run(repo_dir, ["add", "missing-file"]) is None
+        assert worker.run(repo_dir / "not-a-repo", ["status", "--porcelain"]) is None
+    
+    @pytest.mark.asyncio
+    async def test_execute_git_command_timeout(self, repo_dir):
+        """タイムアウトを過ぎたgitコマンドが打ち切られるテスト"""
+        sync_run(["git", "config", "alias.slow", "!sleep 5"], cwd=repo_dir)
+        
+        success, output = await execute_git_command(repo_dir, ["slow"], verbose=False, timeout=0.5)
+        
+        assert not success
+        assert output == "Command timed out after 0.5 seconds"
+    
+    @pytest.mark.asyncio
+    async def test_execute_git_command_without_pygit2(self, repo_dir, monkeypatch):
+        """pygit2が無い場合はgitコマンドで実行されるテスト"""
+        from lib import command_executor
+        worker = GitWorker()
+        worker._available = False
+        monkeypatch.setattr(command_executor, "_git_worker", worker)
+        (repo_dir / "a.txt").write_text("a")
+        
+        assert (await execute_git_command(repo_dir, ["add", "a.txt"], verbose=False))[0]
+        success, output = await execute_git_command(repo_dir, ["commit", "-m", "Add a"], verbose=False)
+        assert success
+        
+        success, output = await execute_git_command(repo_dir, ["commit", "-m", "Again"], verbose=False)
+        assert not success
+        assert "nothing to commit" in output
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -13,7 +13,10 @@ import discord
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.command_manager import CommandManager
+from src.command_manager import CommandManager, _ProgressMessage
+from src.project_manager import ProjectManager
+from lib import command_executor
+from lib.command_executor import sync_run
 
 
 class TestCommandManager:
@@ -56,6 +59,7 @@ class TestCommandManager:
         """モックSettingsオブジェクト"""
         settings = Mock()
         settings.get_claude_options = Mock(return_value="--no-interaction")
+        settings.get_git_concurrency = Mock(return_value=4)
         return settings
     
     @pytest.fixture
@@ -108,22 +112,33 @@ class TestCommandManager:
         # workflow_channelsに登録されているハンドラーを直接モック
         mock_handler = AsyncMock()
         
-        # workflow_channelsの"1-idea"エントリを上書き
-        command_manager.workflow_channels["1-idea"] = mock_handler
+        # workflow_channelsの"idea"エントリを上書き
+        command_manager.workflow_channels["idea"] = mock_handler
         
         await command_manager.process_complete_command(mock_ctx)
         
         mock_handler.assert_called_once_with(mock_ctx)
     
     @pytest.mark.asyncio
-    async def test_handle_idea_complete_success(self, command_manager, mock_ctx):
+    async def test_handle_idea_complete_success(self, command_manager, mock_ctx, tmp_path):
         """#1-ideaでの!complete成功テスト"""
-        # プロジェクトパス設定
-        project_path = Mock(spec=Path)
-        project_path.__str__ = Mock(return_value="/projects/test-app")
-        project_path.exists = Mock(return_value=True)
-        project_path.__truediv__ = Mock(side_effect=lambda x: Mock(exists=Mock(return_value=False)) if x == ".git" else Mock())
-        command_manager.bot.project_manager.get_project_path.return_value = project_path
+        # プロジェクトパス設定（projectsリポジトリは初期化済み）
+        project_path = tmp_path / "test-app"
+        project_path.mkdir()
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "config").write_text('[remote "origin"]\n')
+        project_manager = command_manager.bot.project_manager
+        project_manager.projects_root = tmp_path
+        project_manager.get_project_path.return_value = project_path
+        
+        calls = []
+        
+        async def execute_git_command(path, cmd, timeout=None):
+            calls.append((cmd[1:], timeout))
+            # diff --cached --quietは変更ありの場合に失敗する
+            return cmd[1] != "diff", ""
+        
+        project_manager.execute_git_command = AsyncMock(side_effect=execute_git_command)
         
         # 次チャンネル設定
         next_channel = Mock()
@@ -140,21 +155,25 @@ class TestCommandManager:
         next_channel.send.return_value = message
         
         # セッション設定モック
-        with patch.object(command_manager, '_setup_next_stage_session', new_callable=AsyncMock):
+        with patch.object(command_manager, '_setup_next_stage_session', new_callable=AsyncMock) as mock_session, \
+             patch.object(command_manager, '_terminate_current_session', new_callable=AsyncMock):
             await command_manager.handle_idea_complete(mock_ctx)
         
         # 検証
         assert mock_ctx.send.call_count == 1  # loading message
         loading_msg = mock_ctx.send.return_value
-        loading_msg.edit.assert_called_with(
-            content="✅ idea フェーズが完了しました！\n次フェーズ: #2-requirements"
-        )
+        content = loading_msg.edit.call_args.kwargs["content"]
+        assert content.startswith("✅ **idea** フェーズが完了しました！\n")
+        assert content.endswith("➡️ 次フェーズ: #2-requirements")
+        mock_session.assert_called_once_with(thread, "test-app", "requirements", project_path)
         
-        # Git初期化の確認
-        command_manager.bot.project_manager.init_git_repository.assert_called_once()
+        # 初期化済みのためGit初期化は行わない
+        project_manager.init_git_repository.assert_not_called()
         
-        # Git操作の確認
-        assert command_manager.bot.project_manager.execute_git_command.call_count == 3
+        # Git操作の確認（リモートがあるためpushまで行う）
+        assert [call[0][0] for call in calls] == ["add", "remote", "diff", "commit", "push"]
+        assert calls[3] == (["commit", "-m", "[test-app] Complete idea phase"], None)
+        assert calls[4] == (["push"], 60)
     
     @pytest.mark.asyncio
     async def test_handle_idea_complete_project_not_found(self, command_manager, mock_ctx):
@@ -169,84 +188,344 @@ class TestCommandManager:
         loading_msg.edit.assert_called_with(content="❌ プロジェクト `test-app` が見つかりません")
     
     @pytest.mark.asyncio
-    async def test_handle_tasks_complete_with_github(self, command_manager, mock_ctx):
+    async def test_tasks_complete_stops_when_gh_unauthenticated(self, command_manager, mock_ctx, tmp_path):
+        """ghが未認証の場合は開発環境をセットアップせずに中断するテスト"""
+        command_manager.bot.project_manager.get_project_path.return_value = tmp_path
+        loading_msg = Mock(edit=AsyncMock())
+        mock_ctx.send = AsyncMock(return_value=loading_msg)
+        
+        with patch.object(command_manager, '_execute_git_workflow', new_callable=AsyncMock) as mock_workflow, \
+             patch.object(command_manager, '_get_github_user', new_callable=AsyncMock) as mock_user, \
+             patch.object(command_manager, '_transition_to_development', new_callable=AsyncMock) as mock_transition:
+            mock_workflow.return_value = True
+            mock_user.return_value = "unknown"
+            
+            await command_manager.handle_tasks_complete(mock_ctx)
+        
+        mock_transition.assert_not_called()
+        assert "gh auth login" in loading_msg.edit.call_args.kwargs["content"]
+    
+    @pytest.mark.asyncio
+    async def test_execute_git_workflow_overlaps_remote_check(self, command_manager, tmp_path):
+        """git addとリモート確認が並行して実行され、commit/pushは後に続くテスト"""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "config").write_text('[remote "origin"]\n')
+        calls = []
+        remote_checked = asyncio.Event()
+        
+        async def execute_git_command(path, cmd, timeout=None):
+            calls.append(cmd[1])
+            if cmd[1] == "remote":
+                remote_checked.set()
+            if cmd[1] == "add":
+                # リモート確認が並行して始まらなければタイムアウトする
+                await asyncio.wait_for(remote_checked.wait(), timeout=1)
+                calls.append("add done")
+            # diff --cached --quietは変更ありの場合に失敗する
+            return cmd[1] != "diff", ""
+        
+        command_manager.bot.project_manager.execute_git_command = AsyncMock(side_effect=execute_git_command)
+        loading_msg = Mock(edit=AsyncMock())
+        
+        assert await command_manager._execute_git_workflow(tmp_path, "test-app", "idea", loading_msg)
+        assert calls == ["add", "remote", "add done", "diff", "commit", "push"]
+    
+    @pytest.mark.asyncio
+    async def test_execute_git_workflow_nothing_staged(self, command_manager, tmp_path):
+        """ステージされた変更が無い場合はcommit/pushしないテスト"""
+        (tmp_path / ".git").mkdir()
+        execute = command_manager.bot.project_manager.execute_git_command
+        loading_msg = Mock(edit=AsyncMock())
+        
+        assert await command_manager._execute_git_workflow(tmp_path, "test-app", "idea", loading_msg)
+        
+        commands = [call.args[1][1] for call in execute.call_args_list]
+        assert "commit" not in commands and "push" not in commands
+        loading_msg.edit.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_vercel_deployment_skips_commit_when_nothing_staged(self, command_manager, mock_ctx, tmp_path):
+        """Vercelデプロイ時、ステージされた変更の有無をイベントループを止めずに確認するテスト"""
+        execute = command_manager.bot.project_manager.execute_git_command
+        
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value = Mock(returncode=0, stdout="https://test-app.vercel.app", stderr="")
+            assert await command_manager._execute_vercel_deployment(mock_ctx, tmp_path)
+        
+        execute.assert_called_once_with(tmp_path, ["git", "diff", "--cached", "--quiet"], timeout=None)
+        commands = [call.args[0][:2] for call in mock_run.call_args_list]
+        assert ["git", "diff"] not in commands and ["git", "commit"] not in commands
+    
+    @pytest.mark.asyncio
+    async def test_setup_development_environment_push_failure_continues(self, command_manager):
+        """開発ディレクトリの初回pushが失敗しても続行するテスト"""
+        calls = []
+        
+        async def execute_git_command(path, cmd, timeout=None):
+            calls.append(cmd[1:])
+            # diff --cached --quietは変更ありの場合に失敗する
+            return cmd[1] not in ("diff", "push"), "fatal: unable to access"
+        
+        command_manager.bot.project_manager.execute_git_command = AsyncMock(side_effect=execute_git_command)
+        loading_msg = Mock(edit=AsyncMock())
+        
+        with patch('src.command_manager.async_run', new_callable=AsyncMock) as mock_run, \
+             patch.object(command_manager, '_get_github_user', new_callable=AsyncMock) as mock_user, \
+             patch.object(command_manager, '_setup_github_secrets', new_callable=AsyncMock):
+            mock_run.return_value = (True, "")
+            mock_user.return_value = "testuser"
+            
+            dev_path, github_url = await command_manager._setup_development_environment("test-app", loading_msg)
+        
+        assert dev_path == Path("/achi-kun/test-app")
+        assert github_url == "https://github.com/testuser/test-app"
+        # 初期コミットはリポジトリ作成と並行して行われ、pushはリモート設定の後
+        assert [call[0] for call in calls[-5:]] == ["add", "diff", "commit", "remote", "push"]
+        assert calls[-1] == ["push", "-u", "origin", "HEAD:main"]
+    
+    @pytest.mark.asyncio
+    async def test_setup_development_environment_removes_dir_on_failure(self, command_manager, tmp_path):
+        """開発環境のセットアップに失敗した場合は作成した開発ディレクトリを削除するテスト"""
+        dev_path = tmp_path / "test-app"
+        dev_path.mkdir()
+        (dev_path / "tasks.md").write_text("tasks")
+        project_manager = command_manager.bot.project_manager
+        project_manager.copy_to_development.return_value = dev_path
+        project_manager.init_git_repository.return_value = (False, "fatal: error")
+        loading_msg = Mock(edit=AsyncMock())
+        
+        with patch.object(command_manager, '_get_github_user', new_callable=AsyncMock) as mock_user:
+            mock_user.return_value = "testuser"
+            
+            assert await command_manager._setup_development_environment("test-app", loading_msg) == (None, None)
+        
+        assert not dev_path.exists()
+        assert "Git初期化エラー" in loading_msg.edit.call_args.kwargs["content"]
+    
+    @pytest.mark.asyncio
+    async def test_ensure_projects_repo_initializes_once(self, command_manager, tmp_path):
+        """projectsリポジトリの初期化が同時実行でも一度だけ行われるテスト"""
+        loading_msg = Mock(edit=AsyncMock())
+        
+        with patch.object(command_manager, '_setup_projects_remote', new_callable=AsyncMock) as mock_setup:
+            results = await asyncio.gather(
+                command_manager._ensure_projects_repo(tmp_path, loading_msg),
+                command_manager._ensure_projects_repo(tmp_path, loading_msg)
+            )
+            assert await command_manager._ensure_projects_repo(tmp_path, loading_msg)
+        
+        assert results == [True, True]
+        command_manager.bot.project_manager.init_git_repository.assert_called_once_with(tmp_path)
+        mock_setup.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_setup_projects_remote_commits_during_repo_creation(self, command_manager, tmp_path):
+        """projectsリポジトリの初期コミットがリポジトリ作成と並行して行われ、pushは最後に行われるテスト"""
+        calls = []
+        committed = asyncio.Event()
+        
+        async def execute_git_command(path, cmd, timeout=None):
+            calls.append((cmd[1:], timeout))
+            if cmd[1] == "commit":
+                committed.set()
+            return True, ""
+        
+        async def run_git_tool(cmd, cwd=None):
+            # 初期コミットが並行して進まなければタイムアウトする
+            await asyncio.wait_for(committed.wait(), timeout=1)
+            calls.append((cmd[:3], None))
+            return True, ""
+        
+        command_manager.bot.project_manager.execute_git_command = AsyncMock(side_effect=execute_git_command)
+        
+        with patch.object(command_manager, '_run_git_tool', side_effect=run_git_tool), \
+             patch.object(command_manager, '_get_github_user', new_callable=AsyncMock) as mock_user:
+            mock_user.return_value = "testuser"
+            
+            assert await command_manager._setup_projects_remote(tmp_path, Mock(edit=AsyncMock()))
+        
+        assert [call[0][0] for call in calls] == ["add", "commit", "gh", "push"]
+        assert calls[-1] == (["push", "-u", "origin", "HEAD:main"], 60)
+    
+    @pytest.mark.asyncio
+    async def test_check_git_remote_cached(self, command_manager):
+        """リモート確認結果がキャッシュされ、破棄後は再確認されるテスト"""
+        execute = command_manager.bot.project_manager.execute_git_command
+        repo = Path("/projects")
+        
+        assert await command_manager._check_git_remote(repo)
+        assert await command_manager._check_git_remote(repo)
+        assert execute.call_count == 1
+        
+        command_manager._invalidate_remote_cache(repo)
+        execute.return_value = (False, "error: No such remote 'origin'")
+        assert not await command_manager._check_git_remote(repo)
+        assert execute.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_execute_git_bounded(self, mock_bot, mock_settings):
+        """gitコマンドの同時実行数が設定値に制限されるテスト"""
+        mock_settings.get_git_concurrency.return_value = 1
+        command_manager = CommandManager(mock_bot, mock_settings)
+        running = []
+        
+        async def execute_git_command(path, cmd, timeout=None):
+            running.append(cmd[1])
+            assert len(running) == 1
+            await asyncio.sleep(0)
+            running.remove(cmd[1])
+            return True, ""
+        
+        mock_bot.project_manager.execute_git_command = AsyncMock(side_effect=execute_git_command)
+        
+        await asyncio.gather(
+            command_manager._execute_git(Path("/projects"), ["git", "add", "."]),
+            command_manager._execute_git(Path("/projects"), ["git", "status"])
+        )
+        assert mock_bot.project_manager.execute_git_command.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_check_git_remote_reads_config(self, command_manager, tmp_path):
+        """.git/configにoriginが無ければgitを起動しないテスト"""
+        execute = command_manager.bot.project_manager.execute_git_command
+        config = tmp_path / ".git" / "config"
+        config.parent.mkdir()
+        config.write_text("[core]\n\tbare = false\n")
+        
+        assert not await command_manager._check_git_remote(tmp_path)
+        execute.assert_not_called()
+        
+        command_manager._invalidate_remote_cache(tmp_path)
+        config.write_text('[remote "origin"]\n\turl = https://github.com/testuser/test-app.git\n')
+        assert await command_manager._check_git_remote(tmp_path)
+        execute.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_handle_tasks_complete_with_github(self, command_manager, mock_ctx, tmp_path):
         """#4-tasksでの!complete（GitHub作成含む）テスト"""
         mock_ctx.channel.parent.name = "4-tasks"
+        command_manager.bot.context_manager.get_stage_from_channel.return_value = "tasks"
         
-        # プロジェクトパス設定
-        project_path = Path("/projects/test-app")
+        # プロジェクトパス設定（projectsリポジトリは初期化済み・コミットする変更なし）
+        (tmp_path / ".git").mkdir()
         dev_path = Path("/achi-kun/test-app")
-        command_manager.bot.project_manager.get_project_path.return_value = project_path
-        command_manager.bot.project_manager.copy_to_development.return_value = dev_path
+        project_manager = command_manager.bot.project_manager
+        project_manager.projects_root = tmp_path
+        project_manager.get_project_path.return_value = tmp_path
+        project_manager.copy_to_development.return_value = dev_path
+        
+        # 次チャンネル設定
+        next_channel = Mock()
+        next_channel.send = AsyncMock()
+        next_channel.mention = "#5-development"
+        command_manager.bot.channel_validator.get_required_channel.return_value = next_channel
         
-        # GitHubコマンドモック
-        with patch.object(command_manager, '_run_command', new_callable=AsyncMock) as mock_run:
+        # メッセージとスレッド作成
+        message = Mock()
+        thread = Mock()
+        thread.id = "thread456"
+        thread.send = AsyncMock()
+        message.create_thread = AsyncMock(return_value=thread)
+        next_channel.send.return_value = message
+        
+        # GitHubコマンド・セッション設定モック
+        with patch('src.command_manager.async_run', new_callable=AsyncMock) as mock_run, \
+             patch.object(command_manager, '_get_github_user', new_callable=AsyncMock) as mock_user, \
+             patch.object(command_manager, '_setup_github_secrets', new_callable=AsyncMock) as mock_secrets, \
+             patch.object(command_manager, '_setup_development_session', new_callable=AsyncMock) as mock_session, \
+             patch.object(command_manager, '_terminate_current_session', new_callable=AsyncMock):
             mock_run.return_value = (True, "Repository created")
+            mock_user.return_value = "testuser"
+            mock_secrets.return_value = True
             
-            with patch.object(command_manager, '_get_github_user', new_callable=AsyncMock) as mock_user:
-                mock_user.return_value = "testuser"
-                
-                # 次チャンネル設定
-                next_channel = Mock()
-                next_channel.send = AsyncMock()
-                next_channel.mention = "#5-development"
-                command_manager.bot.channel_validator.get_required_channel.return_value = next_channel
-                
-                # メッセージとスレッド作成
-                message = Mock()
-                thread = Mock()
-                thread.id = "thread456"
-                thread.send = AsyncMock()
-                message.create_thread = AsyncMock(return_value=thread)
-                next_channel.send.return_value = message
-                
-                # セッション設定モック
-                with patch.object(command_manager, '_setup_development_session', new_callable=AsyncMock):
-                    await command_manager.handle_tasks_complete(mock_ctx)
-                
-                # GitHub作成コマンドの確認
-                mock_run.assert_called_with(
-                    ["gh", "repo", "create", "test-app", "--public", "-y"],
-                    cwd=str(dev_path)
-                )
-                
-                # 成功メッセージの確認
-                loading_msg = mock_ctx.send.return_value
-                loading_msg.edit.assert_called_with(
-                    content="✅ tasks フェーズが完了しました！\n"
-                            "🚀 GitHubリポジトリ: https://github.com/testuser/test-app\n"
-                            "次フェーズ: #5-development"
-                )
+            await command_manager.handle_tasks_complete(mock_ctx)
+        
+        # GitHub作成コマンドの確認
+        mock_run.assert_any_call(
+            ["gh", "repo", "create", "test-app", "--public", "--source=.", "--remote=origin"],
+            cwd=str(dev_path)
+        )
+        mock_secrets.assert_called_once_with("test-app", dev_path, "testuser")
+        mock_session.assert_called_once_with(
+            thread, "test-app", str(dev_path), "https://github.com/testuser/test-app"
+        )
+        
+        # 途中経過の後に成功メッセージが表示されることの確認
+        loading_msg = mock_ctx.send.return_value
+        contents = [call.kwargs["content"] for call in loading_msg.edit.call_args_list]
+        assert contents[0] == "`...` GitHub Secretsを設定中..."
+        assert contents[-1].startswith("✅ **tasks** フェーズが完了しました！\n")
+        assert "🚀 GitHubリポジトリ: https://github.com/testuser/test-app\n" in contents[-1]
+        assert contents[-1].endswith("➡️ 次フェーズ: #5-development")
     
     @pytest.mark.asyncio
-    async def test_run_command_success(self, command_manager):
-        """コマンド実行成功テスト"""
-        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-            # プロセスモック
-            process = Mock()
-            process.returncode = 0
-            process.communicate = AsyncMock(return_value=(b"Success output", b""))
-            mock_subprocess.return_value = process
-            
-            success, output = await command_manager._run_command(["echo", "test"])
+    async def test_get_github_user_cached(self, command_manager):
+        """GitHubユーザー名が一度だけ取得されるテスト"""
+        with patch('src.command_manager.async_run', new_callable=AsyncMock) as mock_run:
+            mock_run.return_value = (False, "not logged in")
+            assert await command_manager._get_github_user() == "unknown"
             
-            assert success is True
-            assert output == "Success output"
+            mock_run.return_value = (True, "testuser\n")
+            users = await asyncio.gather(*(command_manager._get_github_user() for _ in range(3)))
+            assert users == ["testuser"] * 3
+            assert await command_manager._get_github_user() == "testuser"
+        
+        assert mock_run.call_count == 2
+    
+    @pytest.fixture
+    def git_repo(self, command_manager, tmp_path, monkeypatch):
+        """実際のProjectManagerを使う、originが設定された一時Gitリポジトリ"""
+        monkeypatch.setenv("PROJECT_ROOT", str(tmp_path))
+        command_manager.bot.project_manager = ProjectManager()
+        repo = tmp_path / "projects"
+        repo.mkdir()
+        for args in (["init"], ["config", "user.name", "Test"], ["config", "user.email", "test@example.com"],
+                     ["remote", "add", "origin", "https://github.com/testuser/achi-kun-projects.git"]):
+            sync_run(["git", *args], cwd=repo)
+        return repo
+    
+    @pytest.fixture
+    def pushes(self, monkeypatch):
+        """git pushだけを記録して成功させ、それ以外はそのまま実行するasync_run"""
+        real_async_run = command_executor.async_run
+        pushes = []
+        
+        async def async_run(command, cwd=None, timeout=None, capture_output=True, verbose=False):
+            if "push" in command:
+                pushes.append((command[command.index("push"):], timeout))
+                return True, ""
+            return await real_async_run(command, cwd=cwd, timeout=timeout,
+                                        capture_output=capture_output, verbose=verbose)
+        
+        monkeypatch.setattr(command_executor, "async_run", async_run)
+        return pushes
     
     @pytest.mark.asyncio
-    async def test_run_command_failure(self, command_manager):
-        """コマンド実行失敗テスト"""
-        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-            # プロセスモック
-            process = Mock()
-            process.returncode = 1
-            process.communicate = AsyncMock(return_value=(b"", b"Error output"))
-            mock_subprocess.return_value = process
-            
-            success, output = await command_manager._run_command(["false"])
+    async def test_execute_git_workflow_push_timeout_reaches_async_run(self, command_manager, git_repo, pushes):
+        """フェーズ完了時のpushのタイムアウトがProjectManager経由でasync_runまで渡されるテスト"""
+        (git_repo / "test-app").mkdir()
+        (git_repo / "test-app" / "idea.md").write_text("idea")
+        
+        assert await command_manager._execute_git_workflow(git_repo, "test-app", "idea", Mock(edit=AsyncMock()))
+        
+        assert pushes == [(["push"], 60)]
+        assert sync_run(["git", "log", "--format=%s"], cwd=git_repo) == (True, "[test-app] Complete idea phase")
+    
+    @pytest.mark.asyncio
+    async def test_setup_projects_remote_pushes_head_to_main(self, command_manager, git_repo, pushes):
+        """projectsリポジトリの初回pushがHEAD:mainとしてタイムアウト付きで実行されるテスト"""
+        (git_repo / "test-app").mkdir()
+        (git_repo / "test-app" / "idea.md").write_text("idea")
+        
+        with patch.object(command_manager, '_run_git_tool', new_callable=AsyncMock) as mock_tool, \
+             patch.object(command_manager, '_get_github_user', new_callable=AsyncMock) as mock_user:
+            mock_tool.return_value = (True, "")
+            mock_user.return_value = "testuser"
             
-            assert success is False
-            assert output == "Error output"
+            assert await command_manager._setup_projects_remote(git_repo, Mock(edit=AsyncMock()))
+        
+        assert pushes == [(["push", "-u", "origin", "HEAD:main"], 60)]
+        assert sync_run(["git", "log", "--format=%s"], cwd=git_repo) == (True, "Initial commit")
     
     @pytest.mark.asyncio
     async def test_setup_next_stage_session(self, command_manager):
@@ -259,7 +538,7 @@ class TestCommandManager:
         project_path = Path("/projects/test-app")
         
         # session_managerモック
-        with patch('src.session_manager.get_session_manager') as mock_get_sm:
+        with patch('src.command_manager.get_session_manager') as mock_get_sm:
             session_manager = Mock()
             session_manager.get_or_create_session = Mock(return_value=1)
             session_manager.create_session_info = Mock()
@@ -276,7 +555,8 @@ class TestCommandManager:
                 mock_doc_file = Mock()
                 mock_doc_file.touch = Mock()
                 
-                with patch.object(Path, '__truediv__', return_value=mock_doc_file):
+                with patch.object(Path, '__truediv__', return_value=mock_doc_file), \
+                     patch.object(command_manager, '_wait_for_claude_ready', new_callable=AsyncMock):
                     await command_manager._setup_next_stage_session(
                         thread, "test-app", "requirements", project_path
                     )
@@ -288,7 +568,7 @@ class TestCommandManager:
                 # ワークフロー更新の確認
                 session_manager.update_project_stage.assert_called_with("test-app", "requirements")
                 session_manager.add_thread_to_workflow.assert_called_with(
-                    "test-app", "r-requirements", "thread789"
+                    "test-app", "2-requirements", "thread789"
                 )
                 
                 # ドキュメント作成の確認
@@ -302,6 +582,121 @@ class TestCommandManager:
                 # プロンプト送信の確認
                 mock_run.assert_called()
 
+    
+    @pytest.mark.asyncio
+    async def test_setup_development_session_starts_tmux_async(self, command_manager, tmp_path):
+        """開発セッションのtmuxがイベントループを止めずに起動されるテスト"""
+        thread = Mock()
+        thread.id = "thread999"
+        thread.name = "test-app"
+        thread.send = AsyncMock()
+        command_manager.bot._register_session_to_flask = AsyncMock()
+        command_manager.prompt_sender.send_prompt = AsyncMock(return_value=(True, "ok"))
+        
+        with patch('src.command_manager.get_session_manager') as mock_get_sm, \
+             patch('src.command_manager.async_run', new_callable=AsyncMock) as mock_run, \
+             patch.object(command_manager, '_wait_for_claude_ready', new_callable=AsyncMock), \
+             patch('subprocess.run', side_effect=AssertionError("blocking call")):
+            mock_get_sm.return_value.get_or_create_session.return_value = 2
+            mock_run.return_value = (True, "")
+            
+            await command_manager._setup_development_session(
+                thread, "test-app", str(tmp_path), "https://github.com/testuser/test-app"
+            )
+        
+        cmd = mock_run.call_args.args[0]
+        assert cmd[:5] == ['tmux', 'new-session', '-d', '-s', 'claude-session-2']
+        thread.send.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_setup_development_session_cancels_on_failure(self, command_manager, tmp_path):
+        """途中で失敗した場合に起動待ちとFlask登録がキャンセルされるテスト"""
+        thread = Mock()
+        thread.id = "thread999"
+        thread.name = "test-app"
+        thread.send = AsyncMock()
+        command_manager.bot.context_manager.generate_development_prompt = Mock(side_effect=RuntimeError("template"))
+        command_manager.prompt_sender.send_prompt = AsyncMock(return_value=(True, "ok"))
+        cancelled = []
+        
+        async def pending(name):
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+        
+        async def start_tmux(cmd):
+            # tmuxの起動中に起動待ちとFlask登録が走り始める
+            await asyncio.sleep(0)
+            return True, ""
+        
+        command_manager.bot._register_session_to_flask = lambda **kwargs: pending("register")
+        
+        with patch('src.command_manager.get_session_manager') as mock_get_sm, \
+             patch('src.command_manager.async_run', new=start_tmux), \
+             patch.object(command_manager, '_wait_for_claude_ready', new=lambda *args: pending("wait")):
+            mock_get_sm.return_value.get_or_create_session.return_value = 2
+            
+            with pytest.raises(RuntimeError):
+                await command_manager._setup_development_session(
+                    thread, "test-app", str(tmp_path), "https://github.com/testuser/test-app"
+                )
+        
+        assert sorted(cancelled) == ["register", "wait"]
+        thread.send.assert_not_called()
+        command_manager.prompt_sender.send_prompt.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_wait_for_claude_ready(self, command_manager):
+        """Claude Codeの入力欄が表示された時点で待機を終えるテスト"""
+        screens = [
+            (False, "can't find session"),
+            (True, "╭──╮\n│ > trust this folder?\n╰──╯"),
+            (True, "╭──╮\n│ > \n╰──╯\n  ? for shortcuts")
+        ]
+        
+        with patch('src.command_manager.async_run', new_callable=AsyncMock) as mock_run, \
+             patch('src.command_manager._CLAUDE_READY_POLL_INTERVAL', 0.01):
+            mock_run.side_effect = screens
+            assert await command_manager._wait_for_claude_ready(3, 8)
+        
+        assert mock_run.call_count == 3
+        assert mock_run.call_args.args[0] == ["tmux", "capture-pane", "-p", "-t", "claude-session-3"]
+        
+        with patch('src.command_manager.async_run', new_callable=AsyncMock) as mock_run, \
+             patch('src.command_manager._CLAUDE_READY_POLL_INTERVAL', 0.01):
+            mock_run.return_value = (True, "")
+            assert not await command_manager._wait_for_claude_ready(3, 0.04)
+        
+        assert mock_run.call_count == 4
+    
+    @pytest.mark.asyncio
+    async def test_progress_message_coalesces_updates(self):
+        """送信中の途中経過は最新のものだけが送られ、最終結果が最後に反映されるテスト"""
+        release = asyncio.Event()
+        edits = []
+        
+        async def edit(content):
+            edits.append(content)
+            await release.wait()
+        
+        message = Mock()
+        message.edit = AsyncMock(side_effect=edit)
+        progress = _ProgressMessage(message)
+        
+        progress.set("step 1")
+        await asyncio.sleep(0)
+        progress.set("step 2")
+        progress.set("step 3")
+        final = asyncio.ensure_future(progress.edit(content="done"))
+        await asyncio.sleep(0)
+        assert edits == ["step 1"]
+        
+        release.set()
+        await final
+        assert edits == ["step 1", "done"]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -9,6 +9,7 @@ import shutil
 from pathlib import Path
 import sys
 import json
+from unittest.mock import patch
 
 # テスト対象のモジュールをインポート
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -132,5 +133,169 @@ class TestSettingsManager(unittest.TestCase):
         self.assertTrue(self.settings.is_configured())
 
 
+class TestEnvCache(unittest.TestCase):
+    """.envキャッシュのテストクラス"""
+    
+    def setUp(self):
+        """一時ディレクトリに.envを配置したSettingsManagerを用意"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_home = Path.home
+        Path.home = lambda: Path(self.temp_dir)
+        
+        self.settings = SettingsManager()
+        self.settings.config_dir = Path(self.temp_dir)
+        self.settings.env_file = Path(self.temp_dir) / '.env'
+        self.settings.attachments_dir = Path(self.temp_dir) / 'attachments'
+        self.settings.run_dir = Path(self.temp_dir) / 'run'
+    
+    def tearDown(self):
+        """後片付け"""
+        Path.home = self.original_home
+        shutil.rmtree(self.temp_dir)
+    
+    def test_load_env_uses_cache_until_mtime_changes(self):
+        """mtimeが変わらない限り再読込しないことのテスト"""
+        self.settings.save_env({'DISCORD_BOT_TOKEN': 'abc'})
+        self.assertEqual(self.settings.get_token(), 'abc')
+        
+        with patch('config.settings._fast_read_bytes', side_effect=AssertionError('re-read')):
+            self.assertEqual(self.settings.get_token(), 'abc')
+    
+    def test_load_env_returns_copy(self):
+        """返された辞書を変更してもキャッシュが汚染されないことのテスト"""
+        self.settings.save_env({'DISCORD_BOT_TOKEN': 'abc'})
+        env_vars = self.settings.load_env()
+        env_vars['DISCORD_BOT_TOKEN'] = 'changed'
+        self.assertEqual(self.settings.get_token(), 'abc')
+    
+    def test_save_env_invalidates_cache(self):
+        """保存後に新しい値が読まれることのテスト"""
+        self.settings.set_token('first')
+        self.assertEqual(self.settings.get_token(), 'first')
+        self.settings.set_token('second')
+        self.assertEqual(self.settings.get_token(), 'second')
+    
+    def test_load_env_parsing(self):
+        """コメント・空行・空白の扱いのテスト"""
+        self.settings.env_file.write_text(
+            "# comment=1\n\nA=1\n  B = x y  \nEMPTY=\nC=a=b\ninvalid line\n"
+        )
+        self.assertEqual(
+            self.settings.load_env(),
+            {'A': '1', 'B': 'x y', 'EMPTY': '', 'C': 'a=b'}
+        )
+    
+    def test_fast_read_bytes_larger_than_hint(self):
+        """想定サイズより大きいファイルも全て読み込めることのテスト"""
+        from config.settings import _fast_read_bytes
+        path = Path(self.temp_dir) / 'big'
+        content = b'x' * 20000
+        path.write_bytes(content)
+        
+        self.assertEqual(_fast_read_bytes(path, 100), content)
+        self.assertEqual(_fast_read_bytes(path, len(content)), content)
+    
+    def test_getters_do_not_copy_env(self):
+        """個別の設定の取得でキャッシュ済みの辞書全体をコピーしないことのテスト"""
+        self.settings.save_env({'CLAUDE_OPTIONS': '--verbose', 'FLASK_PORT': '5002'})
+        self.assertEqual(self.settings.get_claude_options(), '--verbose')
+        
+        with patch.object(self.settings, 'load_env', side_effect=AssertionError('copied')):
+            self.assertEqual(self.settings.get_claude_options(), '--verbose')
+            self.assertEqual(self.settings.get_port('flask'), 5002)
+        
+        # .envの変更は引き続き反映される
+        self.settings.save_env({'CLAUDE_OPTIONS': ''})
+        self.assertEqual(self.settings.get_claude_options(), '')
+        self.assertEqual(self.settings.get_port('flask'), 5001)
+    
+    def test_git_concurrency(self):
+        """git同時実行数の設定のテスト"""
+        self.assertEqual(self.settings.get_git_concurrency(), 4)
+        self.settings.save_env({'GIT_CONCURRENCY': '2'})
+        self.assertEqual(self.settings.get_git_concurrency(), 2)
+        self.settings.save_env({'GIT_CONCURRENCY': 'invalid'})
+        self.assertEqual(self.settings.get_git_concurrency(), 4)
+        self.settings.save_env({'GIT_CONCURRENCY': '0'})
+        self.assertEqual(self.settings.get_git_concurrency(), 1)
+    
+    def test_load_env_missing_file(self):
+        """.envが存在しない場合のテスト"""
+        self.assertEqual(self.settings.load_env(), {})
+        self.assertIsNone(self.settings.get_token())
+
+
+
+class TestMigration(unittest.TestCase):
+    """ホームディレクトリからの設定移行のテストクラス"""
+    
+    def setUp(self):
+        """旧設定ディレクトリを持つ一時ホームを用意"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_home = Path.home
+        self.home = Path(self.temp_dir) / 'home'
+        self.project = Path(self.temp_dir) / 'project'
+        self.home.mkdir()
+        self.project.mkdir()
+        Path.home = lambda: self.home
+        
+        self.settings = SettingsManager()
+        self.settings.config_dir = self.project
+        self.settings.env_file = self.project / '.env'
+        self.settings.attachments_dir = self.project / 'attachments'
+        self.settings.run_dir = self.project / 'run'
+        
+        self.old_dir = self.home / '.claude-discord-bridge'
+        (self.old_dir / 'attachments').mkdir(parents=True)
+        (self.old_dir / '.env').write_text("DISCORD_BOT_TOKEN=old\n")
+        (self.old_dir / 'attachments' / 'a.png').write_bytes(b'png')
+    
+    def tearDown(self):
+        """後片付け"""
+        Path.home = self.original_home
+        shutil.rmtree(self.temp_dir)
+    
+    def test_migrate_moves_env_and_attachments(self):
+        """.envとattachmentsが移動されることのテスト"""
+        self.settings._migrate_from_home_dir()
+        
+        self.assertEqual(self.settings.get_token(), 'old')
+        self.assertFalse((self.old_dir / '.env').exists())
+        self.assertTrue((self.project / 'attachments' / 'a.png').exists())
+        self.assertFalse((self.old_dir / 'attachments').exists())
+    
+    def test_migration_deferred_until_needed(self):
+        """生成時には移行せず、.envの読み込み時に移行することのテスト"""
+        self.assertTrue((self.old_dir / '.env').exists())
+        
+        self.assertEqual(self.settings.get_token(), 'old')
+        self.assertFalse((self.old_dir / '.env').exists())
+    
+    def test_migrate_skipped_after_sentinel(self):
+        """センチネル作成後は移行処理を行わないことのテスト"""
+        (self.project / '.migrated').touch()
+        self.settings._migrate_from_home_dir()
+        
+        self.assertTrue((self.old_dir / '.env').exists())
+        self.assertFalse(self.settings.env_file.exists())
+    
+    def test_migrate_writes_sentinel(self):
+        """移行完了後にセンチネルが作成されることのテスト"""
+        self.settings._migrate_from_home_dir()
+        self.assertTrue((self.project / '.migrated').exists())
+    
+    def test_migrate_falls_back_on_cross_device(self):
+        """別ファイルシステム間ではコピーにフォールバックすることのテスト"""
+        import errno
+        cross_device = OSError(errno.EXDEV, 'Invalid cross-device link')
+        with patch('config.settings.os.replace', side_effect=cross_device), \
+             patch('config.settings.os.rename', side_effect=cross_device):
+            self.settings._migrate_from_home_dir()
+        
+        self.assertEqual(self.settings.get_token(), 'old')
+        self.assertFalse((self.old_dir / '.env').exists())
+        self.assertTrue((self.project / 'attachments' / 'a.png').exists())
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file